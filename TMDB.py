@@ -1,4 +1,5 @@
-import requests
+import http_client
+import tmdb_client
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 from io import BytesIO
 import os
@@ -6,19 +7,19 @@ import shutil
 from urllib.request import urlopen
 import textwrap
 from datetime import datetime, timedelta
+from itertools import islice
 from dotenv import load_dotenv
 load_dotenv(verbose=True)
 
-TMDB_BEARER_TOKEN = os.getenv('TMDB_BEARER_TOKEN')
-TMDB_BASE_URL = os.getenv('TMDB_BASE_URL')
-LANGUAGE = os.getenv("TMDB_LANGUAGE")
+LANGUAGE = os.getenv("TMDB_LANGUAGE", "en-US")
 
+# TMDB_BEARER_TOKEN (your TMDB API Read Access Token) is read from .env by tmdb_client
 
-# Set your TMDB API Read Access Token key here
-headers = {
-    "accept": "application/json",
-    "Authorization": f"Bearer {TMDB_BEARER_TOKEN}"
-}
+# Open connections to the TMDB API and image hosts up front
+http_client.preconnect(tmdb_client.TMDB_BASE_URL, tmdb_client.TMDB_IMAGE_BASE)
+
+# Drop cached TMDB metadata of titles that changed since the last run
+tmdb_client.sync_changes()
 
 
 # Get current date in YYYYMMDD format
@@ -36,7 +37,8 @@ tv_excluded_genres = {
     'XX': ['XXXX','XXXX'],           # Exclude Animation from the US
     'XX': ['*'],
     'XX': ['*'],
-    'X': ['*']
+    'X': ['*'],
+    '*': []                          # Genres excluded whatever the country
 }
 
 # Movie Exclusion list - this filter will exclude movies from chosen countries that have a specific genre
@@ -47,23 +49,31 @@ movie_excluded_genres = {
     'XX': ['XX'],  # Exclude Animation and Drama from US
     'XX': ['*'],
     'XX': ['*'],
-    'XX': ['*']
+    'XX': ['*'],
+    '*': []        # Genres excluded whatever the country
 }
 
 # Keyword exclusion list - this filter will exclude movies or TV shows that contain a specific keyword in their TMDB profile
 excluded_keywords = ['XX', 'XX', 'XX', 'XX', 'XX', 'XX', 'XX','XX']  # like ['adult']
 
-# Filter movies by release date and TV shows by last air date
-
 # Filter movies by release date and TV shows by last air date
 max_air_date = datetime.now() - timedelta(days=90)  # specify the number of days since the movie release or the TV show last air date, shows before this date will be excluded
 
+# Where candidates come from
+# 'discover' compiles the exclusion rules into the TMDB discover query so fewer titles need filtering,
+# 'trending' uses trending/week and applies every rule client-side
+candidate_source = 'discover'
+
+# Candidates are streamed page by page and enriched concurrently in waves of at most this many titles
+# (requests in flight per host are further capped by http_client.PER_HOST_LIMIT)
+enrichment_wave_size = 5
+
 # Save font locally
 truetype_url = 'https://github.com/googlefonts/roboto/raw/main/src/hinted/Roboto-Light.ttf'
 truetype_path = 'Roboto-Light.ttf'
 if not os.path.exists(truetype_path):
     try:
-        response = requests.get(truetype_url, timeout=10)
+        response = http_client.get(truetype_url, timeout=10)
         if response.status_code == 200:
             with open(truetype_path, 'wb') as f:
                 f.write(response.content)
@@ -76,78 +86,52 @@ if not os.path.exists(truetype_path):
 
 
 # Fetching genres for movies
-genres_url = f'{TMDB_BASE_URL}/genre/movie/list?language={LANGUAGE}'
-genres_response = requests.get(genres_url, headers=headers)
-genres_data = genres_response.json()
+genres_data = tmdb_client.get_json('genre/movie/list', {"language": LANGUAGE})
 movie_genres = {genre['id']: genre['name'] for genre in genres_data.get('genres', [])}
 
 # Fetching genres for TV shows
-genres_url = f'{TMDB_BASE_URL}/genre/tv/list?language={LANGUAGE}'
-genres_response = requests.get(genres_url, headers=headers)
-genres_data = genres_response.json()
+genres_data = tmdb_client.get_json('genre/tv/list', {"language": LANGUAGE})
 tv_genres = {genre['id']: genre['name'] for genre in genres_data.get('genres', [])}
 
-# Fetching TV show details
-def get_tv_show_details(tv_id):
-    tv_details_url = f'{TMDB_BASE_URL}/tv/{tv_id}?language={LANGUAGE}'
-    tv_details_response = requests.get(tv_details_url, headers=headers)
-    return tv_details_response.json()
-
-# Fetching movie details
-def get_movie_details(movie_id):
-    movie_details_url = f'{TMDB_BASE_URL}/movie/{movie_id}?language={LANGUAGE}'
-    movie_details_response = requests.get(movie_details_url, headers=headers)
-    return movie_details_response.json()
-
-# Function to fetch keywords for a movie
-def get_movie_keywords(movie_id):
-    keywords_url = f"{TMDB_BASE_URL}/movie/{movie_id}/keywords"
-    response = requests.get(keywords_url, headers=headers)
-    if response.status_code == 200:
-        # Extract and return the names of the keywords
-        return [keyword['name'].lower() for keyword in response.json().get('keywords', [])]
-    return []
-
-# Function to fetch keywords for a TV show
-def get_tv_keywords(tv_id):
-    keywords_url = f"{TMDB_BASE_URL}/tv/{tv_id}/keywords"
-    response = requests.get(keywords_url, headers=headers)
-    if response.status_code == 200:
-        return [keyword['name'].lower() for keyword in response.json().get('results', [])]
-    return []
+# Fetching movie or TV show details, keywords and images in one call
+def get_details(media_type, tmdb_id):
+    return tmdb_client.get_title(media_type, tmdb_id, LANGUAGE)
 
 
-# Filter criteria for movies
+# Filter criteria for movies, returns the exclusion reason or None
 def should_exclude_movie(movie, movie_excluded_countries=movie_excluded_countries, movie_excluded_genres=movie_excluded_genres, excluded_keywords=excluded_keywords):
     # Check if the movie's country is in the excluded countries list
-	origin_countries = [c.lower() for c in movie.get('origin_country', [])]
-	genres = [movie_genres.get(genre_id, '') for genre_id in movie.get('genre_ids', [])]
-	
-	# Fetch movie keywords
-	movie_keywords = get_movie_keywords(movie['id']) if excluded_keywords else []
-	
-	# Check release date
-	release_date_str = movie.get('release_date')
-	release_date = datetime.strptime(release_date_str, "%Y-%m-%d") if release_date_str else None
-	
-	# Exclusion logic by country and genre
-	for country in origin_countries:
-	    if country in movie_excluded_countries:
-	        excluded = movie_excluded_genres.get(country, [])
-	        if excluded == ['*'] or any(genre in excluded for genre in genres):
-	            return True
-	
-	# Exclusion by keyword or date
-	if any(keyword in movie_keywords for keyword in excluded_keywords):
-	    return True
-	
-	if release_date and release_date < max_air_date:
-	    return True
-	
-	return False
-
-
-# Filter criteria for TV shows
+    origin_countries = [c.lower() for c in movie.get('origin_country', [])]
+    genres = [movie_genres.get(genre_id, '') for genre_id in movie.get('genre_ids', [])]
+
+    # Exclusion logic by country and genre
+    for country in origin_countries:
+        if country in movie_excluded_countries:
+            excluded = movie_excluded_genres.get(country, [])
+            if excluded == ['*'] or any(genre in excluded for genre in genres):
+                return f"country {country}"
+
+    # Genres excluded whatever the country
+    for genre in genres:
+        if genre in movie_excluded_genres.get('*', []):
+            return f"genre {genre}"
+
+    # Check release date
+    release_date_str = movie.get('release_date')
+    release_date = datetime.strptime(release_date_str, "%Y-%m-%d") if release_date_str else None
+    if release_date and release_date < max_air_date:
+        return f"released {release_date_str}"
+
+    # Exclusion by keyword, details are only fetched once the cheap checks passed
+    movie_keywords = tmdb_client.title_keywords(get_details('movie', movie['id'])) if excluded_keywords else []
+    for keyword in excluded_keywords:
+        if keyword in movie_keywords:
+            return f"keyword {keyword}"
+
+    return None
+
+
+# Filter criteria for TV shows, returns the exclusion reason or None
 def should_exclude_tvshow(tvshow, tv_excluded_countries=tv_excluded_countries, tv_excluded_genres=tv_excluded_genres, excluded_keywords=excluded_keywords):
     # Ensure 'origin_country' is a list or string and get the country (case insensitive)
     origin_countries = [c.lower() for c in tvshow.get('origin_country', [])]
@@ -157,15 +141,24 @@ def should_exclude_tvshow(tvshow, tv_excluded_countries=tv_excluded_countries, t
         if country in tv_excluded_countries:
             excluded = tv_excluded_genres.get(country, [])
             if excluded == ['*'] or any(genre in excluded for genre in genres):
-                return True
+                return f"country {country}"
+
+    # Genres excluded whatever the country
+    for genre in genres:
+        if genre in tv_excluded_genres.get('*', []):
+            return f"genre {genre}"
 
-    # Fetch TV show keywords and check against the exclusion list
-    tv_keywords = get_tv_keywords(tvshow['id']) if excluded_keywords else []
-    if any(keyword in tv_keywords for keyword in excluded_keywords):
-        return True
+    # Keywords and last air date both come from the enriched details
+    tv_details = get_details('tv', tvshow['id'])
+
+    # Check TV show keywords against the exclusion list
+    tv_keywords = tmdb_client.title_keywords(tv_details) if excluded_keywords else []
+    for keyword in excluded_keywords:
+        if keyword in tv_keywords:
+            return f"keyword {keyword}"
 
     # Check last air date
-    last_air_date_str = get_tv_show_details(tvshow['id']).get('last_air_date')
+    last_air_date_str = tv_details.get('last_air_date')
     if last_air_date_str:
         try:
             last_air_date = datetime.strptime(last_air_date_str, "%Y-%m-%d")
@@ -174,54 +167,118 @@ def should_exclude_tvshow(tvshow, tv_excluded_countries=tv_excluded_countries, t
     else:
         last_air_date = None
 
-    # Exclude if older than max_air_date
+    # Exclude if older than max_air_date, future shows are kept
     if last_air_date and last_air_date < max_air_date:
-        return True
-
-    # Include future shows
-    if last_air_date and last_air_date > datetime.now():
-        return False
-
-    return False
-
-# Endpoint for trending shows
-trending_movies_url = f'{TMDB_BASE_URL}/trending/movie/week?language={LANGUAGE}'
-trending_tvshows_url = f'{TMDB_BASE_URL}/trending/tv/week?language={LANGUAGE}'
-
-# Fetch more than required to allow filtering
-initial_fetch_count = numberofmovies + 10  # Fetch 15 to get at least 5 valid ones
-trending_movies_url = f'{TMDB_BASE_URL}/trending/movie/week?language={LANGUAGE}'
-trending_movies_response = requests.get(trending_movies_url, headers=headers)
-all_movies = trending_movies_response.json().get('results', [])[:initial_fetch_count]
-
-# Filter manually
-valid_movies = []
-for movie in all_movies:
-    if not should_exclude_movie(movie):
-        valid_movies.append(movie)
-    else:
-        print(f"Excluded Movie: {movie['title']} ({movie.get('origin_country')})")
-    
-    if len(valid_movies) >= numberofmovies:
-        break
-
-trending_movies = {'results': valid_movies}
-
-
-# Fetching trending TV shows
-initial_fetch_count = numberoftvshows + 10  # Fetch more than needed
-trending_tvshows_url = f'{TMDB_BASE_URL}/trending/tv/week?language={LANGUAGE}'
-trending_tvshows_response = requests.get(trending_tvshows_url, headers=headers)
-all_tvshows = trending_tvshows_response.json().get('results', [])[:initial_fetch_count]
-
-# Filter manually
-valid_tvshows = []
-for tvshow in all_tvshows:
-    if not should_exclude_tvshow(tvshow):
-        valid_tvshows.append(tvshow)
-    if len(valid_tvshows) >= numberoftvshows:
-        break
-trending_tvshows = {'results': valid_tvshows}
+        return f"last aired {last_air_date_str}"
+
+    return None
+
+
+# Exclusion decisions taken during this run, keyed by (media_type, tmdb_id)
+exclusion_decisions = {}
+
+def select_titles(media_type, candidates, quota, should_exclude):
+    """
+    Single filter pass over a lazy candidate stream. Candidates are decided in concurrent
+    waves no bigger than the remaining quota (see http_client.fan_out), and the stream is
+    not advanced once the quota is met, so no extra page or enrichment call is made. Each title is decided once
+    per run and the decision keeps its reason and enriched details. Returns (title, details)
+    pairs for the first survivors, in candidate order.
+    """
+    def decide(candidate):
+        reason = should_exclude(candidate)
+        return {
+            'reason': reason,
+            'details': None if reason else get_details(media_type, candidate['id']),
+        }
+
+    def unique(stream):
+        # Pages can repeat a title, each id is only decided and selected once
+        seen = set()
+        for candidate in stream:
+            if candidate['id'] not in seen:
+                seen.add(candidate['id'])
+                yield candidate
+
+    label = "Movie" if media_type == 'movie' else "TV Show"
+    selected = []
+    candidates = unique(candidates)
+    while len(selected) < quota:
+        wave = list(islice(candidates, min(enrichment_wave_size, quota - len(selected))))
+        if not wave:
+            break
+
+        pending = [c for c in wave if (media_type, c['id']) not in exclusion_decisions]
+        decisions = http_client.fan_out((tmdb_client.TMDB_BASE_URL, decide, c) for c in pending)
+        for candidate, decision in zip(pending, decisions):
+            exclusion_decisions[(media_type, candidate['id'])] = decision
+
+        # Decisions are read back in candidate order, so ordering and quota don't depend on timing
+        for candidate in wave:
+            decision = exclusion_decisions[(media_type, candidate['id'])]
+            if decision['reason']:
+                print(f"Excluded {label}: {candidate.get('title') or candidate.get('name')} ({decision['reason']})")
+                continue
+            selected.append((candidate, decision['details']))
+    return selected
+
+# Candidate movies, pages are only fetched while the quota is not met
+if candidate_source == 'discover':
+    # Only the rules TMDB can't express are left for should_exclude_movie
+    movie_discover_params, movie_client_keywords = tmdb_client.plan_discover(
+        'movie', LANGUAGE,
+        excluded_genre_ids=[genre_id for genre_id, name in movie_genres.items() if name in movie_excluded_genres.get('*', [])],
+        excluded_keywords=excluded_keywords,
+        min_date=max_air_date
+    )
+    all_movies = tmdb_client.iter_results('discover/movie', movie_discover_params)
+else:
+    movie_client_keywords = excluded_keywords
+    all_movies = tmdb_client.iter_results('trending/movie/week', {"language": LANGUAGE})
+
+# Filter once, the render loop only sees the survivors
+selected_movies = select_titles('movie', all_movies, numberofmovies,
+                                lambda movie: should_exclude_movie(movie, excluded_keywords=movie_client_keywords))
+
+
+# Candidate TV shows, pages are only fetched while the quota is not met
+if candidate_source == 'discover':
+    tv_discover_params, tv_client_keywords = tmdb_client.plan_discover(
+        'tv', LANGUAGE,
+        excluded_genre_ids=[genre_id for genre_id, name in tv_genres.items() if name in tv_excluded_genres.get('*', [])],
+        excluded_keywords=excluded_keywords,
+        min_date=max_air_date
+    )
+    all_tvshows = tmdb_client.iter_results('discover/tv', tv_discover_params)
+else:
+    tv_client_keywords = excluded_keywords
+    all_tvshows = tmdb_client.iter_results('trending/tv/week', {"language": LANGUAGE})
+
+# Filter once, the render loop only sees the survivors
+selected_tvshows = select_titles('tv', all_tvshows, numberoftvshows,
+                                 lambda tvshow: should_exclude_tvshow(tvshow, excluded_keywords=tv_client_keywords))
+
+# Backdrop and logo URLs of a selected title, either may be None
+def artwork_urls(title, details):
+    # Backdrops are scaled to 1500px height, logos fit in a 1000x500 box
+    backdrop_path = title.get('backdrop_path')
+    backdrop_url = tmdb_client.backdrop_url(backdrop_path, render_height=1500, details=details) if backdrop_path else None
+    logo = tmdb_client.pick_logo(tmdb_client.title_logos(details), LANGUAGE)
+    return backdrop_url, tmdb_client.logo_url(logo, 1000, 500) if logo else None
+
+# Download the artwork of every selected title at once instead of one file at a time while rendering
+# (titles without a backdrop are skipped when rendering, so their logo is not needed)
+artwork_to_fetch = []
+for title, details in selected_movies + selected_tvshows:
+    backdrop_url, logo_url = artwork_urls(title, details)
+    if backdrop_url:
+        artwork_to_fetch += [backdrop_url, logo_url] if logo_url else [backdrop_url]
+artwork = dict(zip(artwork_to_fetch, http_client.get_all(artwork_to_fetch, timeout=10)))
+
+def download_artwork(url):
+    # Prefetched responses are handed out once, a failed prefetch is retried directly
+    response = artwork.pop(url, None)
+    return response if response is not None else http_client.get(url, timeout=10)
 
 # Create a directory to save the backgrounds and clear its contents
 background_dir = "tmdb_backgrounds"
@@ -272,41 +329,9 @@ def clean_filename(filename):
     cleaned_filename = "".join(c if c.isalnum() or c in "._-" else "_" for c in filename)
     return cleaned_filename
 
-# Fetch movie or TV show logo in English
-def get_logo(media_type, media_id, language):
-    # Prepare language code (fr-FR -> fr)
-    lang_code = language.split("-")[0]
-
-    # Build TMDB API URL
-    url = f"{TMDB_BASE_URL}/{media_type}/{media_id}/images?language={LANGUAGE}"
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        return None
-
-    logos = response.json().get("logos", [])
-
-    # If no logos at all, try English fallback
-    if not logos:
-        url_en = f"{TMDB_BASE_URL}/{media_type}/{media_id}/images?language=en"
-        response_en = requests.get(url_en, headers=headers)
-        if response_en.status_code == 200:
-            logos_en = response_en.json().get("logos", [])
-            if logos_en:
-                return sorted(logos_en, key=lambda x: x.get("vote_average", 0), reverse=True)[0]["file_path"]
-        return None
-
-    # 1. Exact match for requested language
-    lang_match = [l for l in logos if l.get("iso_639_1") == LANGUAGE]
-    if lang_match:
-        # Pick highest rated
-        return sorted(lang_match, key=lambda x: x.get("vote_average", 0), reverse=True)[0]["file_path"]
-
-    # 4. Last fallback: best-rated logo overall
-    return sorted(logos, key=lambda x: x.get("vote_average", 0), reverse=True)[0]["file_path"]
-
-def process_image(image_url, title, is_movie, genre, year, rating, duration=None, seasons=None):
-    # Download the background image with a timeout of 10 seconds
-    response = requests.get(image_url, timeout=10)
+def process_image(image_url, title, is_movie, genre, year, rating, duration=None, seasons=None, logo_url=None):
+    # Get the background image, prefetched with the rest of the artwork
+    response = download_artwork(image_url)
     if response.status_code == 200:
         # Open the image
         image = Image.open(BytesIO(response.content))
@@ -368,17 +393,10 @@ def process_image(image_url, title, is_movie, genre, year, rating, duration=None
         draw.text((info_position[0] + shadow_offset, info_position[1] + shadow_offset), info_text, font=font_overview, fill=shadow_color)
         draw.text(info_position, info_text, font=font_overview, fill=overview_color)
 
-        # Get logo image URL
-        if is_movie:
-            logo_path = get_logo("movie", movie['id'], language="en")
-        else:
-            logo_path = get_logo("tv", tvshow['id'], language="en")
-
         logo_drawn = False  # Flag to track if logo is drawn
 
-        if logo_path:
-            logo_url = f"https://image.tmdb.org/t/p/original{logo_path}"
-            logo_response = requests.get(logo_url)
+        if logo_url:
+            logo_response = download_artwork(logo_url)
             if logo_response.status_code == 200:
                 try:
                     logo_image = Image.open(BytesIO(logo_response.content))
@@ -412,20 +430,13 @@ def process_image(image_url, title, is_movie, genre, year, rating, duration=None
 
 
 # Process each trending movie
-for movie in trending_movies.get('results', []):
-    if should_exclude_movie(movie):
-        print(f"Excluded Movie: {movie['title']} ({movie.get('origin_country')})")
-        continue
-
+for movie, movie_details in selected_movies:
     # Extract movie details
     title = movie['title']
     overview = movie['overview']
     year = movie['release_date']
     rating = round(movie['vote_average'], 1)
     genre = ', '.join([movie_genres[genre_id] for genre_id in movie['genre_ids']])
-
-    # Fetch additional movie details
-    movie_details = get_movie_details(movie['id'])
     duration = movie_details.get('runtime', 0)
 
     # Format duration as hours and minutes
@@ -437,43 +448,31 @@ for movie in trending_movies.get('results', []):
         duration = "N/A"
 
     # Check if backdrop image is available
-    backdrop_path = movie['backdrop_path']
+    image_url, logo_url = artwork_urls(movie, movie_details)
     custom_text = "Now Trending on"
-    if backdrop_path:
-        # Construct image URL
-        image_url = f"https://image.tmdb.org/t/p/original{backdrop_path}"
+    if image_url:
         # Process the image
-        process_image(image_url, title, is_movie=True, genre=genre, year=year, rating=rating, duration=duration)
+        process_image(image_url, title, is_movie=True, genre=genre, year=year, rating=rating, duration=duration, logo_url=logo_url)
     else:
         # Print error message if no backdrop image found
         print(f"No backdrop image found for {title}")
 
 # Process trending TV shows
-for tvshow in trending_tvshows.get('results', []):
-    if should_exclude_tvshow(tvshow):
-        print(f"Excluded TV Show: {tvshow['name']} ({tvshow.get('origin_country')})")
-        continue
-
+for tvshow, tv_details in selected_tvshows:
     # Extract TV show details
     title = truncate_overview(tvshow['name'], 38)
     overview = tvshow['overview']
     year = tvshow['first_air_date']
     rating = round(tvshow['vote_average'], 1)
     genre = ', '.join([tv_genres[genre_id] for genre_id in tvshow['genre_ids']])
-
-    # Fetch additional TV show details
-    tv_details = get_tv_show_details(tvshow['id'])
     seasons = tv_details.get('number_of_seasons', 0)
 
     # Check if backdrop image is available
-    backdrop_path = tvshow['backdrop_path']
+    image_url, logo_url = artwork_urls(tvshow, tv_details)
     custom_text = "Now Trending on"
-    if backdrop_path:
-        # Construct image URL
-        image_url = f"https://image.tmdb.org/t/p/original{backdrop_path}"
-
+    if image_url:
         # Process the image
-        process_image(image_url, title, is_movie=False, genre=genre, year=year, rating=rating, seasons=seasons)
+        process_image(image_url, title, is_movie=False, genre=genre, year=year, rating=rating, seasons=seasons, logo_url=logo_url)
     else:
         # Print error message if no backdrop image found
         print(f"No backdrop image found for {title}")
@@ -0,0 +1,117 @@
+# Shared HTTP client for the background scripts
+# Every script goes through one requests.Session so connections to the same
+# host (TMDB, Plex, Jellyfin, Radarr/Sonarr...) are kept alive and reused
+
+import asyncio
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# === Client Options ===
+DEFAULT_TIMEOUT = 10     # Seconds before a request is abandoned when no timeout is given
+POOL_HOSTS = 10          # Number of per-host connection pools kept around
+POOL_MAXSIZE = 10        # Keep-alive connections kept per host
+PER_HOST_LIMIT = 6       # Requests in flight per host during a fan_out()
+
+
+class TimeoutSession(requests.Session):
+    """
+    requests.Session that applies DEFAULT_TIMEOUT to calls made without one.
+    """
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+def create_session():
+    """
+    Builds a session with a keep-alive connection pool mounted for http and https.
+    """
+    new_session = TimeoutSession()
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE)
+    new_session.mount('http://', adapter)
+    new_session.mount('https://', adapter)
+    return new_session
+
+
+# Shared session, also handed to plexapi so it reuses the same pool
+session = create_session()
+
+
+def get(url, **kwargs):
+    """
+    Drop-in replacement for requests.get() that goes through the shared session.
+    """
+    return session.get(url, **kwargs)
+
+
+def preconnect(*urls, timeout=3):
+    """
+    Opens a connection to each distinct host in urls in the background, so the
+    first real request does not pay for the TCP and TLS handshakes while the
+    script is busy with something else. Failures are ignored.
+    """
+    origins = []
+    for url in urls:
+        if not url:
+            continue
+        parts = urlsplit(url)
+        if parts.scheme and parts.netloc:
+            origin = f"{parts.scheme}://{parts.netloc}/"
+            if origin not in origins:
+                origins.append(origin)
+
+    def warm(origin):
+        try:
+            session.head(origin, timeout=timeout, allow_redirects=False)
+        except requests.exceptions.RequestException:
+            pass
+
+    for origin in origins:
+        threading.Thread(target=warm, args=(origin,), daemon=True).start()
+
+
+def fan_out(calls, per_host=PER_HOST_LIMIT):
+    """
+    Runs blocking calls concurrently on an asyncio event loop and returns their
+    results in the order of calls. Each call runs in a worker thread, and at most
+    per_host calls talking to the same host are in flight at once.
+
+    :param calls: Iterable of (url, function, *args) tuples. The url only picks the
+        host limit, the function does the actual work (e.g. get or a TMDB helper).
+    :param per_host: Concurrency limit per host, kept below POOL_MAXSIZE so every
+        call finds a pooled connection.
+    """
+    calls = list(calls)
+    if not calls:
+        return []
+
+    async def run_all():
+        # Semaphores belong to the loop created by asyncio.run, so they are made here
+        limits = {}
+
+        async def run(url, function, *args):
+            limit = limits.setdefault(urlsplit(url).netloc, asyncio.Semaphore(per_host))
+            async with limit:
+                return await asyncio.to_thread(function, *args)
+
+        return await asyncio.gather(*(run(*call) for call in calls))
+
+    return asyncio.run(run_all())
+
+
+def get_all(urls, per_host=PER_HOST_LIMIT, **kwargs):
+    """
+    Downloads urls concurrently through the shared session, see fan_out().
+    Returns one response per url, None for requests that failed to complete.
+    """
+    def fetch(url):
+        try:
+            return get(url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+
+    return fan_out(((url, fetch, url) for url in urls), per_host)
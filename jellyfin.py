@@ -8,11 +8,15 @@ import shutil
 import textwrap
 from dotenv import load_dotenv
 load_dotenv(verbose=True)
+import http_client
 
 # Jellyfin Server Configuration (Global Parameters)
 baseurl = os.getenv('JELLYFIN_BASEURL')
 token = os.getenv('JELLYFIN_TOKEN')
 user_id = os.getenv('JELLYFIN_USER_ID')
+
+# Open the connection to the Jellyfin server while the script starts up
+http_client.preconnect(baseurl)
 # try to connect to the server and get the user name
 
 try:
@@ -21,7 +25,7 @@ try:
     print(f'token:{token}')
     print(f'user_id:{user_id}')
     url = f"{baseurl}/Users/{user_id}"
-    response = requests.get(url, headers={"X-Emby-Token": token})
+    response = http_client.get(url, headers={"X-Emby-Token": token})
     response.raise_for_status()
     data = response.json()
     print(f"Connected to Jellyfin! User name: {data.get('Name')}")
@@ -35,7 +39,7 @@ truetype_path = 'Roboto-Light.ttf'
 
 if not os.path.exists(truetype_path):
     try:
-        response = requests.get(truetype_url, timeout=10)
+        response = http_client.get(truetype_url, timeout=10)
         if response.status_code == 200:
             with open(truetype_path, 'wb') as f:
                 f.write(response.content)
@@ -89,7 +93,7 @@ def download_logo_in_memory(media_item):
     logo_url = f"{baseurl}/Items/{media_item['Id']}/Images/Logo?api_key={token}"
     
     try:
-        response = requests.get(logo_url, timeout=10)
+        response = http_client.get(logo_url, timeout=10)
         if response.status_code == 200:
             logo_image = Image.open(BytesIO(response.content))
             return logo_image  # Return the logo as a PIL Image object
@@ -103,7 +107,7 @@ def download_logo_in_memory(media_item):
 def get_excluded_library_paths():
     """Fetch library IDs based on excluded library names."""
     headers = {'X-Emby-Token': token}
-    response = requests.get(f"{baseurl}/Library/VirtualFolders", headers=headers)
+    response = http_client.get(f"{baseurl}/Library/VirtualFolders", headers=headers)
     
     if response.status_code == 200:
         libraries = response.json()
@@ -127,7 +131,7 @@ def download_latest_media(order_by, limit, media_type):
         'SortOrder': 'Descending',
         'Fields': 'Path,Overview,Genres,CommunityRating,PremiereDate,Tags',
     }
-    response = requests.get(f"{baseurl}/Users/{user_id}/Items", headers=headers, params=params)
+    response = http_client.get(f"{baseurl}/Users/{user_id}/Items", headers=headers, params=params)
 
     if response.status_code == 200:
         media_items = response.json()['Items']
@@ -155,7 +159,7 @@ def download_latest_media(order_by, limit, media_type):
         if background_url:
             try:
                 # Download the background image with a timeout of 10 seconds
-                response = requests.get(background_url, timeout=10)
+                response = http_client.get(background_url, timeout=10)
 
                 if response.status_code == 200:
                     filename_safe_title = unicodedata.normalize('NFKD', item['Name']).encode('ASCII', 'ignore').decode('utf-8')
@@ -207,7 +211,7 @@ def download_latest_media(order_by, limit, media_type):
                             rating_text = ""
                         
                         seasons_url = f"{baseurl}/Shows/{item['Id']}/Seasons?api_key={token}"
-                        response = requests.get(seasons_url, timeout=10)
+                        response = http_client.get(seasons_url, timeout=10)
 
                         if response.status_code == 200:
                             full_response_data = response.json()
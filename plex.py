@@ -2,7 +2,6 @@
 import os
 import time
 import math
-import random
 import shutil
 import textwrap
 import unicodedata
@@ -15,6 +14,10 @@ from plexapi.server import PlexServer
 from dotenv import load_dotenv
 load_dotenv(verbose=True)
 
+# === Local Imports ===
+import http_client
+import plex_adapter
+
 # === User Configurable Options ===
 
 # NOTE: It's recommended to load these from environment variables
@@ -35,6 +38,8 @@ download_movies = True      # Allow background generation for Plex movies
 download_series = True      # Allow background generation for Plex TV series
 limit = 10                  # Max backgrounds per content type (TV/movies), so total can be up to limit × enabled types
 debug = False               # Enable debug message printing
+fast_listing = True         # Read Plex listings as light JSON records, only the picked items are loaded as full plexapi objects
+original_art = False        # Download Plex art at full size instead of pre-sized by the Plex photo transcoder
 
 # Plex logo settings
 logo_variant = "white"  # "white" or "color"
@@ -100,6 +105,9 @@ if not baseurl or baseurl.strip() == '' or not token or token.strip() == '':
     print("2. Set BASEURL and TOKEN as environment variables in the .env file.")
     exit(1)
 
+# Open the connection to the Plex server while the fonts are being prepared
+http_client.preconnect(baseurl)
+
 # Initialize the PlexServer instance globally
 plex_instance = None
 
@@ -134,7 +142,7 @@ def download_font(url, path):
     """
     try:
         if not os.path.exists(path):
-            response = requests.get(url, timeout=10)
+            response = http_client.get(url, timeout=10)
             if response.status_code == 200:
                 with open(path, 'wb') as f:
                     f.write(response.content)
@@ -156,7 +164,7 @@ def initialize_plex_connection():
     """
     global plex_instance  # Access the global plex_instance variable
     if plex_instance is None:  # Ensure we only initialize once
-        plex_instance = PlexServer(baseurl, token)
+        plex_instance = PlexServer(baseurl, token, session=http_client.session)
         try:
             plex_version = plex_instance.version
             debug and print(f"[DEBUG] Connected to Plex Server: {plex_version}")
@@ -310,13 +318,18 @@ def download_logo_in_memory(media_item) -> Image.Image or None:
     """
     Attempts to download the Plex clearLogo image for a media item directly into memory.
 
+    Items whose metadata shows they have no clearLogo are skipped without a request.
+
     :param media_item: Plex media object.
     :return: PIL Image object of logo, or None if unavailable.
     """
-    logo_url = f"{baseurl}/library/metadata/{media_item.ratingKey}/clearLogo?X-Plex-Token={token}"
+    logo_url = plex_adapter.clear_logo_url(media_item, baseurl, token)
+    if logo_url is None:
+        debug and print(f"No clearLogo for {media_item.title}")
+        return None
 
     try:
-        response = requests.get(logo_url, timeout=10)
+        response = http_client.get(logo_url, timeout=10)
         if response.status_code == 200:
             return Image.open(BytesIO(response.content))
         else:
@@ -353,14 +366,18 @@ def generate_background_for_item(item, media_type, group_type='',
     # Ensure the target folder exists
     os.makedirs(target_folder, exist_ok=True)
 
-    background_url = item.artUrl
+    # Art is scaled by Plex to the size it is drawn at, unless original_art is set
+    background_url = plex_adapter.art_url(item, height=1500, original=original_art)
     if not background_url:
         debug and print(f"No background art URL for {item.title}")
         return
 
     try:
-        # Download the background image from Plex
-        response = requests.get(background_url, timeout=10)
+        # Download the background image from Plex, and the clearLogo at the same time
+        response, logo_image = http_client.fan_out([
+            (background_url, lambda: http_client.get(background_url, timeout=10)),
+            (background_url, download_logo_in_memory, item),
+        ])
         response.raise_for_status()
 
         # Load image directly from bytes into memory
@@ -437,8 +454,7 @@ def generate_background_for_item(item, media_type, group_type='',
             rating_text = f"IMDb: {rating}" if rating else ""
             contentrating = getattr(item, "contentRating", None) or ""
             contentrating_text = contentrating if contentrating else ""
-            seasons = getattr(item, "seasons", lambda: [])()
-            seasons_count = len(seasons)
+            seasons_count = plex_adapter.season_count(item)
             seasons_text = f"{seasons_count} Season" if seasons_count == 1 else f"{seasons_count} Seasons" if seasons_count else ""
 
             info_parts = [str(item.year)]
@@ -540,7 +556,6 @@ def generate_background_for_item(item, media_type, group_type='',
         canvas.paste(plex_logo, (logo_x, logo_y), plex_logo)
 
         # Logo or fallback title
-        logo_image = download_logo_in_memory(item)
         if logo_image:
             logo_resized = resize_logo(logo_image, 1300, 400).convert('RGBA')
             logo_position = (210, info_position[1] - logo_resized.height - 25)
@@ -600,45 +615,21 @@ def download_latest_media(order_by, limit, media_type,
         debug and print("[DEBUG] Series downloads disabled; skipping.")
         return
 
-    def sort_movies(movies, key_attr):
-        """
-        Sort movies based on a given datetime attribute.
-        """
-        filtered = [m for m in movies if getattr(m, key_attr) is not None]
-        return sorted(filtered, key=lambda x: getattr(x, key_attr), reverse=True)
-
-    def sort_shows(shows, key_attr):
-        """
-        Sort TV shows based on the latest episode's datetime attribute.
-        """
-        shows_with_dates = []
-        for show in shows:
-            episodes = show.episodes()
-            episodes_with_date = [ep for ep in episodes if getattr(ep, key_attr) is not None]
-            if episodes_with_date:
-                latest_episode = max(episodes_with_date, key=lambda ep: getattr(ep, key_attr))
-                shows_with_dates.append((show, getattr(latest_episode, key_attr)))
-        return [s[0] for s in sorted(shows_with_dates, key=lambda x: x[1], reverse=True)]
-
     if media_type == 'movie':
-        media_items = plex_instance.library.search(libtype='movie')
-        if order_by == 'aired':
-            media_sorted = sort_movies(media_items, 'originallyAvailableAt')
-        elif order_by == 'added':
-            media_sorted = sort_movies(media_items, 'addedAt')
-        else:
+        if order_by not in plex_adapter.SORT_FIELDS:
             print("Invalid order_by parameter. Please use 'aired' or 'added'.")
             return
+        # Sorted and limited by Plex, only the top items of each movie section are loaded
+        movie_sections = plex_adapter.library_sections(plex_instance, 'movie')
+        media_sorted = plex_adapter.newest_items(movie_sections, order_by, limit, fast=fast_listing)
 
     elif media_type == 'tv':
-        media_items = plex_instance.library.search(libtype='show')
-        if order_by == 'aired':
-            media_sorted = sort_shows(media_items, 'originallyAvailableAt')
-        elif order_by == 'added':
-            media_sorted = sort_shows(media_items, 'addedAt')
-        else:
+        if order_by not in plex_adapter.SORT_FIELDS:
             print("Invalid order_by parameter. Please use 'aired' or 'added'.")
             return
+        # Shows are ranked by their latest episode from one sorted episode listing
+        show_sections = plex_adapter.library_sections(plex_instance, 'show')
+        media_sorted = plex_adapter.newest_shows(show_sections, order_by, limit, fast=fast_listing)
     else:
         print("Invalid media_type parameter. Use 'movie' or 'tv'.")
         return
@@ -657,78 +648,11 @@ def download_latest_media(order_by, limit, media_type,
         )
         time.sleep(plex_api_delay_seconds)
 
-def fetch_items(media_type, sort_type, count):
-    """
-    Fetch media items of a given type sorted by specified attribute.
-
-    Args:
-        media_type (str): 'movie' or 'show'.
-        sort_type (str): 'aired', 'added', or 'random'.
-        count (int): Number of items to fetch.
-
-    Returns:
-        list: Sorted/fetched media items.
-    """
-
-    # Ensure global plex_instance is initialized
-    initialize_plex_connection()
-
-    # Get sections relevant for the media type
-    if media_type == 'movie':
-        sections = [s for s in plex_instance.library.sections() if s.type == 'movie']
-    elif media_type == 'show':
-        sections = [s for s in plex_instance.library.sections() if s.type == 'show']
-    else:
-        print(f"[ERROR] Invalid media_type: {media_type}. Expected 'movie' or 'show'.")
-        return []
-
-    # Aggregate all items from all sections
-    items = []
-    for section in sections:
-        items.extend(section.search())
-
-    # Sort/filter items based on sort_type
-    if sort_type == 'aired':
-        filtered = [i for i in items if getattr(i, 'originallyAvailableAt', None) is not None]
-        sorted_items = sorted(filtered, key=lambda x: x.originallyAvailableAt, reverse=True)
-    elif sort_type == 'added':
-        filtered = [i for i in items if getattr(i, 'addedAt', None) is not None]
-        sorted_items = sorted(filtered, key=lambda x: x.addedAt, reverse=True)
-    elif sort_type == 'random':
-        # Random sample (no sort needed)
-        return random.sample(items, min(count, len(items)))
-    else:
-        return []
-
-    return sorted_items[:count]
-
-def dedup(items, seen):
-    """
-    Remove duplicates from a list of media items based on their unique ratingKey.
-
-    Args:
-        items (list): List of media items to filter.
-        seen (set): A set of ratingKeys already encountered; used to track duplicates across multiple calls.
-
-    Returns:
-        list: A new list containing only unique media items not previously seen.
-
-    Notes:
-    The function updates the 'seen' set with the ratingKeys of newly returned items.
-    This helps avoid duplicates when fetching items in multiple batches.
-    """
-    unique_items = []
-    for item in items:
-        if item.ratingKey not in seen:
-            seen.add(item.ratingKey)
-            unique_items.append(item)
-    return unique_items
-
 def get_mixed_media(limit, download_movies=True, download_series=True, seen=None):
     """
     Fetches a mixed collection of Plex media items (movies or shows), split evenly
-    across three groups: 'aired', 'added', and 'random'. Handles deduplication and
-    adaptive overfetching to ensure enough unique items per group.
+    across three groups: 'aired', 'added', and 'random'. Every group is picked from
+    one library snapshot and deduplicated against the others in memory.
 
     Args:
         limit (int): Number of items to fetch per media type.
@@ -763,33 +687,19 @@ def get_mixed_media(limit, download_movies=True, download_series=True, seen=None
     else:
         media_type = 'movie'  # Fallback: assume movies only if ambiguous
 
+    # One snapshot of the library per run, every group is picked from it in memory.
+    # The sorted groups keep adjusted_limit items, enough to refill a group whose
+    # top items were already picked by another group.
+    snapshot = plex_adapter.LibrarySnapshot(plex_instance, media_type, depth=adjusted_limit, fast=fast_listing)
+
     # Loop through each group type
     for group_type in ['aired', 'added', 'random']:
-        collected = []
-        attempts = 0
-        max_attempts = 3
-        overfetch_factor = 1.5
-
-        while len(collected) < per_group and attempts < max_attempts:
-            overfetch_count = int(per_group * overfetch_factor)
-            fetched = fetch_items(media_type, group_type, overfetch_count)
-            unique = dedup(fetched, seen)
-            new_items = [item for item in unique if item not in collected]
-            collected.extend(new_items)
-            attempts += 1
-            overfetch_factor *= 0.9  # Slightly decrease each attempt
-
-            debug and print(f"[DEBUG] [{media_type.upper()}][{group_type.upper()}] Attempt {attempts}: "
-                            f"Fetched {len(fetched)}, Unique {len(unique)}, "
-                            f"New {len(new_items)}, Total Collected {len(collected)}")
-
-            if len(new_items) == 0:
-                break  # No more new items likely available
+        collected = snapshot.pick(group_type, per_group, seen)
 
         if len(collected) < per_group:
             debug and print(f"[DEBUG] ⚠️ Only {len(collected)} {media_type}s available for group '{group_type}' (expected {per_group})")
 
-        final_items_by_group[group_type] = collected[:per_group]
+        final_items_by_group[group_type] = collected
 
         debug and print(f"[DEBUG] [{media_type.upper()}][{group_type.upper()}] Final count: {len(final_items_by_group[group_type])}")
         for item in final_items_by_group[group_type]:
@@ -812,6 +722,9 @@ def main_process(order_by, limit, download_movies, download_series,
     # Ensure global plex_instance is initialized
     initialize_plex_connection()
 
+    # Count the metadata fetches plexapi makes behind our back while rendering
+    reload_counter = plex_adapter.count_reloads() if debug else None
+
     if order_by == 'mix':
         # Mixed mode: fetch per-type to respect limit for each
         if download_movies:
@@ -863,6 +776,10 @@ def main_process(order_by, limit, download_movies, download_series,
                 plex_logo=plex_logo
             )
 
+    if reload_counter is not None:
+        reload_counter.stop()
+        print(f"[DEBUG] Implicit plexapi reloads this run: {reload_counter.summary()}")
+
 # === Main Execution Logic ===
 
 # Validate user-configurable color and offset settings before use
@@ -0,0 +1,651 @@
+# Shared Plex listing helpers for the Plex scripts
+# Selection is pushed to the server: listings are requested already sorted and
+# limited, instead of loading every item of the library and sorting in Python.
+# With fast=True listings are parsed from Plex JSON into ListingRecords, and only
+# the items actually picked are turned into plexapi objects
+# Friend servers are discovered by probing all their connections at once, starting
+# from the URI that answered last time (see plex_cache)
+
+import concurrent.futures
+import heapq
+import logging
+import random
+import threading
+from collections import Counter
+from itertools import islice
+from urllib.parse import urlencode
+
+from plexapi import utils
+from plexapi.exceptions import BadRequest, NotFound
+from plexapi.myplex import MyPlexAccount
+from plexapi.server import PlexServer
+
+import http_client
+import plex_cache
+
+# Listing field behind each sorted group type
+SORT_FIELDS = {
+    'aired': 'originallyAvailableAt',
+    'added': 'addedAt',
+}
+
+# Sections whose first page is requested at the same time
+SECTION_CONCURRENCY = 4
+# Episodes per page when ranking shows, a season drop puts many episodes of one show in a row
+EPISODE_PAGE_SIZE = 100
+# Items per page when a random pick has to walk the listing
+RANDOM_PAGE_SIZE = 200
+# JPEG quality asked from the Plex photo transcoder
+TRANSCODE_QUALITY = 90
+# Width of the pre-blurred art asked from the Plex photo transcoder, upscaled locally to the canvas
+BLUR_SOURCE_WIDTH = 384
+# Seconds a single connection URI of a server gets to answer during discovery
+CONNECT_TIMEOUT = 5
+# Seconds discovery waits overall, servers that did not answer by then are skipped
+DISCOVERY_DEADLINE = 15
+
+
+def library_sections(plex, section_type):
+    """
+    Returns the library sections of a type.
+
+    :param plex: Connected PlexServer.
+    :param section_type: 'movie' or 'show'.
+    """
+    return [section for section in plex.library.sections() if section.type == section_type]
+
+
+class ListingRecord:
+    """
+    Compact listing entry holding only the fields selection reads. Dates are kept as
+    Plex sends them (addedAt as a timestamp, originallyAvailableAt as YYYY-MM-DD),
+    which sort the same way as the datetimes plexapi would build.
+    """
+    __slots__ = ('ratingKey', 'type', 'title', 'year', 'addedAt', 'originallyAvailableAt',
+                 'art', 'genres', 'rating', 'audienceRating', 'duration', 'childCount',
+                 'grandparentRatingKey', 'images')
+
+    def __init__(self, data):
+        self.ratingKey = utils.cast(int, data.get('ratingKey'))
+        self.type = data.get('type')
+        self.title = data.get('title')
+        self.year = utils.cast(int, data.get('year'))
+        self.addedAt = utils.cast(int, data.get('addedAt'))
+        self.originallyAvailableAt = data.get('originallyAvailableAt')
+        self.art = data.get('art')
+        self.genres = tuple(genre.get('tag') for genre in data.get('Genre', []))
+        self.rating = data.get('rating')
+        self.audienceRating = data.get('audienceRating')
+        self.duration = utils.cast(int, data.get('duration'))
+        self.childCount = utils.cast(int, data.get('childCount'))
+        self.grandparentRatingKey = utils.cast(int, data.get('grandparentRatingKey'))
+        # Image tags by type, e.g. {'clearLogo': '/library/metadata/1/clearLogo/123'}
+        self.images = {image.get('type'): image.get('url') for image in data.get('Image', [])}
+
+
+def fetch_page(section, sort, libtype, start, size):
+    """
+    Requests a single page of a sorted section listing
+    (X-Plex-Container-Start/X-Plex-Container-Size).
+    """
+    return section.search(libtype=libtype, sort=sort, container_start=start, container_size=size, maxresults=size)
+
+
+def fetch_records(section, sort, libtype, start, size):
+    """
+    Fast listing path for fetch_page(): the same page requested as JSON and parsed into
+    ListingRecords, without building a plexapi object per item.
+    """
+    server = section._server
+    params = {}
+    if libtype:
+        params['type'] = utils.searchType(libtype)
+    if sort:
+        params['sort'] = sort
+    headers = {
+        'Accept': 'application/json',
+        'X-Plex-Token': server._token,
+        'X-Plex-Container-Start': str(start),
+        'X-Plex-Container-Size': str(size),
+    }
+    response = http_client.get(f"{server._baseurl}/library/sections/{section.key}/all", params=params, headers=headers)
+    if response.status_code == 400:
+        raise BadRequest(f"({response.status_code}) {response.url}")
+    response.raise_for_status()
+    metadata = response.json().get('MediaContainer', {}).get('Metadata', [])
+    return [ListingRecord(entry) for entry in metadata]
+
+
+def iter_sorted(section, sort, libtype=None, page_size=50, first_page=None, fetch=fetch_page):
+    """
+    Lazily yields the items of a section in the server's sort order. The next page is
+    only requested once the previous one has been consumed.
+
+    :param first_page: Already fetched first page, if any.
+    :param fetch: fetch_page, or fetch_records for the fast listing path.
+    """
+    start = 0
+    page = first_page if first_page is not None else fetch(section, sort, libtype, start, page_size)
+    while True:
+        yield from page
+        if len(page) < page_size:
+            return
+        start += page_size
+        page = fetch(section, sort, libtype, start, page_size)
+
+
+def merged_listing(sections, field, libtype=None, page_size=50, fast=False):
+    """
+    Lazily yields the items of several sections, most recent field value first. Each
+    section streams its listing sorted by the server (sort=<field>:desc) and the streams
+    are merged with a heap, so stopping early leaves the rest of the library unread.
+    The first page of every section is requested concurrently.
+
+    :param sections: Library sections to search.
+    :param field: Date field to sort on, e.g. 'addedAt'.
+    :param libtype: Item type to list, defaults to the section type.
+    :param page_size: Items per page request.
+    :param fast: Yield ListingRecords instead of plexapi objects.
+    """
+    sort = f"{field}:desc"
+    fetch = fetch_records if fast else fetch_page
+    first_pages = http_client.fan_out(
+        ((section._server._baseurl, fetch, section, sort, libtype, 0, page_size) for section in sections),
+        per_host=SECTION_CONCURRENCY,
+    )
+    # Undated items can't be ranked, they are skipped (and the next page read if needed)
+    streams = [
+        (item for item in iter_sorted(section, sort, libtype, page_size, first_page, fetch) if getattr(item, field, None) is not None)
+        for section, first_page in zip(sections, first_pages)
+    ]
+    return heapq.merge(*streams, key=lambda item: getattr(item, field), reverse=True)
+
+
+def newest_items(sections, sort_type, count, libtype=None, fast=False):
+    """
+    Returns the count most recent items across library sections, newest first.
+    Memory grows with count x sections, not with the library size.
+
+    :param sections: Library sections to search.
+    :param sort_type: 'aired' or 'added'.
+    :param count: Number of items wanted.
+    :param libtype: Item type to list, defaults to the section type.
+    :param fast: List through fetch_records(), only the result is loaded as plexapi objects.
+    :return: List of plexapi items.
+    """
+    if not sections or count <= 0:
+        return []
+    # No section can contribute more than count items, so one page is normally all it takes
+    ranked = list(islice(merged_listing(sections, SORT_FIELDS[sort_type], libtype, count, fast), count))
+    return as_items(sections[0]._server, ranked)
+
+
+def newest_shows(sections, sort_type, count, fast=False):
+    """
+    Returns the count TV shows with the most recent episode, newest first.
+    Shows are ranked from a single episode-level listing sorted by the server and
+    grouped by grandparentRatingKey, which stops as soon as count distinct shows are
+    known. The shows themselves are then loaded in one bulk request.
+
+    :param sections: TV show library sections.
+    :param sort_type: 'aired' or 'added', the episode date to rank by.
+    :param count: Number of shows wanted.
+    :param fast: List the episodes through fetch_records().
+    :return: List of plexapi Show objects.
+    """
+    if not sections or count <= 0:
+        return []
+
+    show_keys = []
+    for episode in merged_listing(sections, SORT_FIELDS[sort_type], 'episode', EPISODE_PAGE_SIZE, fast):
+        if episode.grandparentRatingKey not in show_keys:
+            show_keys.append(episode.grandparentRatingKey)
+            if len(show_keys) == count:
+                break
+    if not show_keys:
+        return []
+
+    return load_items(sections[0]._server, show_keys)
+
+
+def load_items(plex, rating_keys):
+    """
+    Loads items by ratingKey in one bulk /library/metadata request, in the given order.
+    The metadata endpoint returns every field and tag rendering reads, so the items
+    are handed out with auto-reload turned off.
+    """
+    if not rating_keys:
+        return []
+    ekey = f"/library/metadata/{','.join(str(key) for key in rating_keys)}?includeGuids=1"
+    items = {item.ratingKey: item for item in render_ready(plex.fetchItems(ekey))}
+    return [items[key] for key in rating_keys if key in items]
+
+
+def as_items(plex, entries):
+    """
+    Returns plexapi objects ready for rendering for listing entries. ListingRecords and
+    plexapi listing objects alike are loaded in one bulk request, listing payloads are
+    partial (truncated tags, missing fields) and auto-reload is off on rendered items.
+    """
+    return load_items(plex, [entry.ratingKey for entry in entries])
+
+
+def render_ready(items):
+    """
+    Turns off plexapi auto-reload on items about to be rendered. An attribute the
+    response didn't carry (no rating, no content rating...) then reads as None instead
+    of silently fetching the item's full metadata again.
+    """
+    for item in items:
+        item._autoReload = False
+    return items
+
+
+class ReloadCounter(logging.Filter):
+    """
+    Counts the implicit reloads plexapi logs ("Reloading <item> for attr '<attr>'").
+    Installed as a filter on the plexapi logger by count_reloads(): it sees every
+    record, and only lets through the ones the logger's own level would have let
+    through, so handlers (a plexapi log file, the root logger) get nothing extra.
+    """
+
+    def __init__(self, logger):
+        super().__init__()
+        self.logger = logger
+        self.previous_level = logger.level
+        self.threshold = logger.getEffectiveLevel()
+        self.count = 0
+        self.attrs = Counter()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if isinstance(record.msg, str) and record.msg.startswith('Reloading') and record.args:
+            with self._lock:
+                self.count += 1
+                self.attrs[record.args[-1]] += 1
+        return record.levelno >= self.threshold
+
+    def stop(self):
+        """
+        Stops counting and restores the level of the plexapi logger.
+        """
+        self.logger.removeFilter(self)
+        self.logger.setLevel(self.previous_level)
+
+    def summary(self):
+        """
+        Returns e.g. '3 (genres: 2, audienceRating: 1)'.
+        """
+        attrs = ", ".join(f"{attr}: {count}" for attr, count in self.attrs.most_common())
+        return f"{self.count} ({attrs})" if attrs else str(self.count)
+
+
+def count_reloads():
+    """
+    Starts counting implicit plexapi reloads and returns the ReloadCounter, call its
+    stop() once done. plexapi only logs them at DEBUG level, so the logger is lowered
+    to DEBUG meanwhile, and the counter filters out what the old level would have dropped.
+    """
+    logger = logging.getLogger('plexapi')
+    counter = ReloadCounter(logger)
+    logger.addFilter(counter)
+    logger.setLevel(logging.DEBUG)
+    return counter
+
+
+def random_items(sections, count, exclude=(), libtype=None, fast=False):
+    """
+    Returns up to count random items across sections, skipping the ratingKeys in exclude.
+    Plex picks them with sort=random and a container just big enough, so a random pick
+    costs about count items. Servers that reject sort=random fall back on reservoir
+    sampling over the paged listing, which never holds more than count items.
+
+    :param sections: Library sections to pick from.
+    :param count: Number of items wanted.
+    :param exclude: ratingKeys that must not be picked.
+    :param libtype: Item type to list, defaults to the section type.
+    :param fast: List through fetch_records(), only the picks are loaded as plexapi objects.
+    :return: List of plexapi items.
+    """
+    if not sections or count <= 0:
+        return []
+    fetch = fetch_records if fast else fetch_page
+    try:
+        picked = server_random_items(sections, count, exclude, libtype, fetch)
+    except (BadRequest, NotFound) as e:
+        print(f"[WARN] Plex rejected sort=random ({e}), sampling the listing instead")
+        picked = reservoir_sample(sections, count, exclude, libtype, fetch)
+    return as_items(sections[0]._server, picked)
+
+
+def server_random_items(sections, count, exclude=(), libtype=None, fetch=fetch_page):
+    """
+    Random pick done by the server. Picks are spread over sections in proportion to
+    their size, so a small section is not over-represented.
+    """
+    sizes = [section.totalViewSize(libtype=libtype, includeCollections=False) for section in sections]
+    if not any(sizes):
+        return []
+    wanted = Counter(random.choices(range(len(sections)), weights=sizes, k=count))
+
+    items = []
+    for index, section_count in wanted.items():
+        # Ask for enough extra items to make up for the excluded ones
+        page = fetch(sections[index], 'random', libtype, 0, section_count + len(exclude))
+        items.extend([item for item in page if item.ratingKey not in exclude][:section_count])
+    random.shuffle(items)
+    return items
+
+
+def reservoir_sample(sections, count, exclude=(), libtype=None, fetch=fetch_page):
+    """
+    Uniform random pick over the paged listing of every section (reservoir sampling).
+    """
+    reservoir = []
+    candidates = 0
+    for section in sections:
+        for item in iter_sorted(section, None, libtype, RANDOM_PAGE_SIZE, fetch=fetch):
+            if item.ratingKey in exclude:
+                continue
+            candidates += 1
+            if len(reservoir) < count:
+                reservoir.append(item)
+            else:
+                slot = random.randrange(candidates)
+                if slot < count:
+                    reservoir[slot] = item
+    random.shuffle(reservoir)
+    return reservoir
+
+
+class LibrarySnapshot:
+    """
+    Per-run view of one library type for mix mode. The sorted groups are listed once
+    (bounded by depth), then every group and dedup against seen is computed from them
+    in memory. Random picks are left to the server, see random_items().
+    """
+
+    def __init__(self, plex, section_type, depth, fast=False):
+        """
+        :param plex: Connected PlexServer.
+        :param section_type: 'movie' or 'show'.
+        :param depth: Items kept per sorted group, enough to refill a group after dedup
+            (the total number of items picked across groups).
+        :param fast: Keep ListingRecords, only picked items become plexapi objects.
+        """
+        self.plex = plex
+        self.sections = library_sections(plex, section_type)
+        self.depth = depth
+        self.fast = fast
+        self._ranked = {}
+
+    def ranked(self, sort_type):
+        """
+        Returns the depth most recent entries for 'aired' or 'added', listed on first use.
+        """
+        if sort_type not in self._ranked:
+            listing = merged_listing(self.sections, SORT_FIELDS[sort_type], page_size=self.depth, fast=self.fast)
+            self._ranked[sort_type] = list(islice(listing, self.depth))
+        return self._ranked[sort_type]
+
+    def pick(self, group_type, count, seen):
+        """
+        Returns up to count items of a group ('aired', 'added' or 'random') that are not
+        in seen, and adds their ratingKeys to seen.
+        """
+        if group_type in SORT_FIELDS:
+            entries = [entry for entry in self.ranked(group_type) if entry.ratingKey not in seen][:count]
+            picked = as_items(self.plex, entries)
+        elif group_type == 'random':
+            picked = random_items(self.sections, count, exclude=seen, fast=self.fast)
+        else:
+            return []
+        seen.update(item.ratingKey for item in picked)
+        return picked
+
+
+def season_count(show):
+    """
+    Returns the number of seasons of a show from the listing metadata (childCount),
+    instead of the extra /children request len(show.seasons()) makes. Like seasons(),
+    the count includes the Specials season.
+
+    :param show: plexapi Show from a listing or a bulk fetch.
+    """
+    count = getattr(show, 'childCount', None)
+    if count is None:
+        # Not part of this response, fall back on listing the seasons
+        seasons = getattr(show, 'seasons', None)
+        return len(seasons()) if seasons else 0
+    return count
+
+
+def clear_logo(item):
+    """
+    Returns the path of an item's clearLogo from the Image entries of its listing or
+    metadata response, '' when the entries show it has none, or None when the response
+    carried no Image entries to tell.
+    """
+    images = getattr(item, 'images', None)
+    if not images:
+        return None
+    if isinstance(images, dict):
+        return images.get('clearLogo', '')
+    for image in images:
+        if getattr(image, 'type', None) == 'clearLogo':
+            return image.url
+    return ''
+
+
+def clear_logo_url(item, baseurl, token):
+    """
+    Returns the URL to download an item's clearLogo from, or None when it has none, so
+    no request is spent on a 404. Items without Image entries get the plain
+    /clearLogo endpoint as before.
+    """
+    path = clear_logo(item)
+    if path == '':
+        return None
+    if path is None:
+        path = f"/library/metadata/{item.ratingKey}/clearLogo"
+    if path.startswith('http'):
+        return f"{path}{'&' if '?' in path else '?'}X-Plex-Token={token}"
+    return f"{baseurl}{path}?X-Plex-Token={token}"
+
+
+def art_url(item, width=None, height=None, original=False, quality=TRANSCODE_QUALITY):
+    """
+    Returns the URL of an item's background art, scaled by the Plex photo transcoder
+    (PlexServer.transcodeImage) to just cover the box it is drawn in, instead of the
+    full-size original.
+
+    :param item: plexapi item, its server builds the URL and adds the token.
+    :param width: Width the art is scaled to, None when only the height matters.
+    :param height: Height the art is scaled to, None when only the width matters.
+    :param original: Download the untouched original art instead.
+    :param quality: JPEG quality of the transcoded art.
+    :return: URL, or None when the item has no art.
+    """
+    art = getattr(item, 'art', None)
+    if not art:
+        return None
+    if original or not (width or height):
+        return item._server.url(art, includeToken=True)
+    url = item._server.transcodeImage(
+        art, height or 1, width or 1,
+        minSize=True,   # Cover the box rather than fit in it
+        upscale=False,  # Small art is still upscaled locally, no need to transfer the extra pixels
+    )
+    # transcodeImage has no quality option
+    return f"{url}&{urlencode({'quality': quality})}"
+
+
+def blurred_art_url(item, canvas_size=(3840, 2160), blur_radius=800, width=BLUR_SOURCE_WIDTH):
+    """
+    Returns the URL of a tiny copy of an item's art, already blurred by the Plex photo
+    transcoder (PlexServer.transcodeImage). Upscaled to canvas_size it stands in for a
+    local GaussianBlur of blur_radius on the full canvas, which is the heaviest step of
+    the color templates.
+
+    :param item: plexapi item, its server builds the URL and adds the token.
+    :param canvas_size: Size of the blurred canvas layer the art is upscaled to.
+    :param blur_radius: Blur radius at canvas size, scaled down with the art.
+    :param width: Width of the art requested from Plex.
+    :return: URL, or None when the item has no art.
+    """
+    art = getattr(item, 'art', None)
+    if not art:
+        return None
+    scale = width / canvas_size[0]
+    url = item._server.transcodeImage(
+        art, round(canvas_size[1] * scale), width,
+        blur=max(1, round(blur_radius * scale)),
+        minSize=True,
+        upscale=True,   # Small art still has to fill the requested size for the blur to match
+    )
+    return f"{url}&{urlencode({'quality': TRANSCODE_QUALITY})}"
+
+
+def connect_servers(candidates, timeout=CONNECT_TIMEOUT, deadline=DISCOVERY_DEADLINE):
+    """
+    Connects to several Plex servers at once. Every candidate connection of every
+    server (local, remote, relay) is probed concurrently and the first one to answer
+    wins for its server, so offline servers and dead URIs only cost the deadline once
+    instead of one timeout each, one after another.
+
+    :param candidates: List of (uris, access_token) tuples, one per server.
+    :param timeout: Seconds each connection attempt may take.
+    :param deadline: Seconds to wait overall before giving up on the remaining servers.
+    :return: List aligned with candidates holding a PlexServer, or None for servers
+        that did not answer in time.
+    """
+    servers = [None] * len(candidates)
+    probes = [
+        (index, uri, access_token)
+        for index, (uris, access_token) in enumerate(candidates)
+        for uri in uris
+    ]
+    if not probes:
+        return servers
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(probes))
+    futures = {
+        executor.submit(PlexServer, uri, access_token, session=http_client.session, timeout=timeout): index
+        for index, uri, access_token in probes
+    }
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout=deadline):
+            index = futures[future]
+            if servers[index] is None and future.exception() is None:
+                servers[index] = future.result()
+                if all(server is not None for server in servers):
+                    break
+    except concurrent.futures.TimeoutError:
+        pass
+    # Probes still running are left to their own timeout, nobody waits for them
+    executor.shutdown(wait=False, cancel_futures=True)
+    return servers
+
+
+def fetch_discovery(token):
+    """
+    Asks plex.tv for the friends of an account and the servers they share with it.
+    Both calls are issued together.
+
+    :param token: Plex account token.
+    :return: Dict with 'friends', a list of {'id', 'title'}, and 'servers', a list of
+        {'owner_id', 'name', 'client_id', 'access_token', 'connections', 'uri'} where
+        connections are the candidate URIs in preference order and uri is the one
+        that last answered.
+    """
+    account = MyPlexAccount(token=token, session=http_client.session)
+    users, resources = http_client.fan_out([
+        ('https://plex.tv', account.users),
+        ('https://clients.plex.tv', account.resources),
+    ])
+    friends = [{'id': user.id, 'title': user.title} for user in users]
+    friend_ids = {friend['id'] for friend in friends}
+    servers = [
+        {
+            'owner_id': resource.ownerId,
+            'name': resource.name,
+            'client_id': resource.clientIdentifier,
+            'access_token': resource.accessToken,
+            'connections': resource.preferred_connections(),
+            'uri': None,
+        }
+        for resource in resources
+        if resource.provides == 'server' and not resource.owned and resource.ownerId in friend_ids
+    ]
+    return {'friends': friends, 'servers': servers}
+
+
+def shared_servers(discovery, target_friend=None):
+    """
+    Returns (owner, server) pairs of a discovery, limited to one friend when given.
+    """
+    owners = {friend['id']: friend['title'] for friend in discovery['friends']}
+    return [
+        (owners[server['owner_id']], server)
+        for server in discovery['servers']
+        if owners.get(server['owner_id']) and (not target_friend or owners[server['owner_id']] == target_friend)
+    ]
+
+
+def refresh_discovery(token, discovery):
+    """
+    Fetches the discovery from plex.tv again and saves it, keeping the URIs that
+    answered this run. Meant to run in the background while the backgrounds render.
+    """
+    try:
+        fresh = fetch_discovery(token)
+    except Exception as e:
+        print(f"[WARN] Could not refresh the Plex discovery cache: {e}")
+        return
+    answered = {server['client_id']: server['uri'] for server in discovery['servers']}
+    for server in fresh['servers']:
+        server['uri'] = answered.get(server['client_id'])
+    plex_cache.save_discovery(token, fresh)
+
+
+def friend_servers(token, target_friend=None):
+    """
+    Connects to the servers friends share with an account.
+
+    With a cached discovery (see plex_cache), each server is first tried on the URI
+    that answered last time, then on all its cached connections, and plex.tv is only
+    asked again in the background for the next run. Without one, plex.tv is asked
+    first and every connection is probed.
+
+    :param token: Plex account token.
+    :param target_friend: Only connect to the servers of this friend.
+    :return: List of (owner, server name, PlexServer or None) tuples.
+    """
+    discovery = plex_cache.load_discovery(token)
+    cached = discovery is not None
+    if not cached:
+        discovery = fetch_discovery(token)
+    shared = shared_servers(discovery, target_friend)
+
+    connected = [None] * len(shared)
+    if cached:
+        # One direct connect per server on the URI that answered last time
+        connected = connect_servers(
+            [([server['uri']] if server['uri'] else [], server['access_token']) for _, server in shared],
+            deadline=CONNECT_TIMEOUT,
+        )
+    # Servers without a working URI yet get every connection probed
+    missing = [index for index, plex in enumerate(connected) if plex is None]
+    retried = connect_servers([(shared[index][1]['connections'], shared[index][1]['access_token']) for index in missing])
+    for index, plex in zip(missing, retried):
+        connected[index] = plex
+
+    for (_, server), plex in zip(shared, connected):
+        if plex is not None:
+            server['uri'] = plex._baseurl
+    if cached:
+        threading.Thread(target=refresh_discovery, args=(token, discovery), daemon=True).start()
+    else:
+        plex_cache.save_discovery(token, discovery)
+
+    return [(owner, server['name'], plex) for (owner, server), plex in zip(shared, connected)]
@@ -0,0 +1,60 @@
+# On-disk cache of plex.tv discovery for the plexfriend scripts
+# Keeps the friends, their shared servers and the connection URI that last answered
+# for each server, so a run can connect straight to the servers instead of asking
+# plex.tv and probing every connection first
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Folder holding one discovery file per Plex account
+CACHE_DIR = os.getenv('PLEX_CACHE_DIR', os.path.join('.cache', 'plex'))
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# Seconds a discovery is trusted before plex.tv is asked again before connecting
+# Friends and shared servers rarely change, and every run refreshes it in the background
+DISCOVERY_TTL = int(os.getenv('PLEX_DISCOVERY_TTL', DAY))
+
+
+def _discovery_path(token):
+    # Files are named after a digest of the account token, never the token itself
+    digest = hashlib.sha1(token.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"discovery_{digest}.json")
+
+
+def load_discovery(token):
+    """
+    Returns the cached discovery of an account, or None when missing or expired.
+
+    :param token: Plex account token.
+    :return: Dict with 'friends' and 'servers', see plex_adapter.fetch_discovery().
+    """
+    try:
+        with open(_discovery_path(token), encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry.get('stored', 0) > DISCOVERY_TTL:
+        return None
+    return entry.get('data')
+
+
+def save_discovery(token, data):
+    """
+    Saves the discovery of an account. The file holds the access tokens of the shared
+    servers, so it is only readable by the current user.
+    """
+    path = _discovery_path(token)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see half an entry
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as f:
+            json.dump({'stored': time.time(), 'data': data}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARN] Could not write the Plex discovery cache: {e}")
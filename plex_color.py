@@ -2,16 +2,16 @@
 # === Standard Library Imports ===
 import os
 import time
-from datetime import datetime
 import math
-import random
 import shutil
 import textwrap
 import unicodedata
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
 
 # === Third-Party Imports ===
-import re
 import numpy as np
 import requests
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
@@ -19,6 +19,10 @@ from plexapi.server import PlexServer
 from dotenv import load_dotenv
 load_dotenv(verbose=True)
 
+# === Local Imports ===
+import http_client
+import plex_adapter
+
 # === User Configurable Options ===
 
 # NOTE: It's recommended to load these from environment variables
@@ -39,6 +43,9 @@ download_movies = True      # Allow background generation for Plex movies
 download_series = True      # Allow background generation for Plex TV series
 limit = 10                  # Max backgrounds per content type (TV/movies), so total can be up to limit × enabled types
 debug = False               # Enable debug message printing
+fast_listing = True         # Read Plex listings as light JSON records, only the picked items are loaded as full plexapi objects
+original_art = False        # Download Plex art at full size instead of pre-sized by the Plex photo transcoder
+server_blur = True          # Let Plex blur a tiny copy of the art for the canvas, instead of blurring it locally
 
 # Plex logo settings
 logo_variant = "white"  # "white" or "color"
@@ -82,27 +89,22 @@ shadow_offset   = 2                   # Shadow offset in pixels (x and y directi
 # Seconds to sleep between processing each media item to reduce Plex server load
 plex_api_delay_seconds = 1.0  # Default 1 second; adjust as needed if Plex is struggling to keep up
 
+# Processes drawing backgrounds in parallel, downloads from Plex stay one item at a time
+render_workers = None  # Default None uses every CPU core; set to 1 to render one background at a time
+
 # === Script Initialization ===
 # NOTE: This section and those below are for internal script use only.
 # User configurable options are above this point.
 
-# Create a directory to save the backgrounds and clear its contents
+# Directory to save the backgrounds, cleared when the script starts (see the main block)
 background_dir = "plex_backgrounds"
-if os.path.exists(background_dir):
-    shutil.rmtree(background_dir)
-os.makedirs(background_dir, exist_ok=True)
 
 # If baseurl or token are not hardcoded, then load from environment variables
 baseurl = locals().get('baseurl', os.getenv('PLEX_BASEURL'))  # Plex server base URL either hardcoded or from environment
 token = locals().get('token', os.getenv('PLEX_TOKEN'))  # Plex API token either hardcoded from environment
 
-# Validate that either hardcoded values or environment variables are set
-if not baseurl or baseurl.strip() == '' or not token or token.strip() == '':
-    print("ERROR: Both Plex server base URL and API token are required.")
-    print("Please set one of the following options:")
-    print("1. Uncomment and set your hardcoded baseurl and token in the script.")
-    print("2. Set BASEURL and TOKEN as environment variables in the .env file.")
-    exit(1)
+# The settings are validated, and the Plex server and fonts are contacted, in the main
+# block only: spawned render workers import this module again and must not repeat it
 
 # Initialize the PlexServer instance globally
 plex_instance = None
@@ -138,7 +140,7 @@ def download_font(url, path):
     """
     try:
         if not os.path.exists(path):
-            response = requests.get(url, timeout=10)
+            response = http_client.get(url, timeout=10)
             if response.status_code == 200:
                 with open(path, 'wb') as f:
                     f.write(response.content)
@@ -160,7 +162,7 @@ def initialize_plex_connection():
     """
     global plex_instance  # Access the global plex_instance variable
     if plex_instance is None:  # Ensure we only initialize once
-        plex_instance = PlexServer(baseurl, token)
+        plex_instance = PlexServer(baseurl, token, session=http_client.session)
         try:
             plex_version = plex_instance.version
             debug and print(f"[DEBUG] Connected to Plex Server: {plex_version}")
@@ -210,15 +212,17 @@ def vignette_side(h, w, fade_ratio=5, fade_power=5.0, position="bottom-left"):
     mask = Image.fromarray(alpha)
     return mask
 
-def generate_background_fast(input_img, target_width=3000):
+def generate_background_fast(input_img, target_width=3000, blurred_img=None):
     """
     Faster background generator:
     - Blurry darkened canvas
     - Vignette mask for foreground
     - Pastes resized image top-right
+
+    :param blurred_img: Art already blurred by Plex, used for the canvas when given.
     """
     # Step 1: Create blurry/dark canvas
-    canvas_rgb = create_blurry_background(input_img, size=(3840, 2160), blur_radius=800)
+    canvas_rgb = create_blurry_background(input_img, size=(3840, 2160), blur_radius=800, blurred_img=blurred_img)
     canvas_array = np.array(canvas_rgb).astype(np.float32)
     canvas_array = (canvas_array * 0.4).clip(0, 255).astype(np.uint8)  # darken
     canvas_rgb = Image.fromarray(canvas_array)
@@ -234,7 +238,7 @@ def generate_background_fast(input_img, target_width=3000):
 
     # Step 3: Apply bottom-left vignette
     h, w = img_resized.height, img_resized.width
-    mask = vignette_side(h, w, fade_ratio=0.3, fade_power=2.5, position="bottom-left")
+    mask = vignette_mask(h, w)
     img_resized.putalpha(mask)
 
     # Step 4: Paste aligned top-right
@@ -245,12 +249,18 @@ def generate_background_fast(input_img, target_width=3000):
 
 
 
-def create_blurry_background(image, size=(3840, 2160), blur_radius=800, dither_strength=16):
+def create_blurry_background(image, size=(3840, 2160), blur_radius=800, dither_strength=16, blurred_img=None):
     """
     Create a blurry canvas background from the input image, with strong noise to prevent banding.
+
+    When blurred_img is given (a tiny copy already blurred by Plex), it is only upscaled
+    to size, which skips the local GaussianBlur on the full canvas.
     """
-    bg = image.resize(size, Image.LANCZOS)
-    bg = bg.filter(ImageFilter.GaussianBlur(radius=blur_radius))
+    if blurred_img is not None:
+        bg = blurred_img.convert("RGB").resize(size, Image.BICUBIC)
+    else:
+        bg = image.resize(size, Image.LANCZOS)
+        bg = bg.filter(ImageFilter.GaussianBlur(radius=blur_radius))
     bg_array = np.array(bg).astype(np.float32)
 
     # Ajoute du bruit aléatoire (dithering doux)
@@ -390,13 +400,18 @@ def download_logo_in_memory(media_item) -> Image.Image or None:
     """
     Attempts to download the Plex clearLogo image for a media item directly into memory.
 
+    Items whose metadata shows they have no clearLogo are skipped without a request.
+
     :param media_item: Plex media object.
     :return: PIL Image object of logo, or None if unavailable.
     """
-    logo_url = f"{baseurl}/library/metadata/{media_item.ratingKey}/clearLogo?X-Plex-Token={token}"
+    logo_url = plex_adapter.clear_logo_url(media_item, baseurl, token)
+    if logo_url is None:
+        debug and print(f"No clearLogo for {media_item.title}")
+        return None
 
     try:
-        response = requests.get(logo_url, timeout=10)
+        response = http_client.get(logo_url, timeout=10)
         if response.status_code == 200:
             return Image.open(BytesIO(response.content))
         else:
@@ -406,20 +421,107 @@ def download_logo_in_memory(media_item) -> Image.Image or None:
 
     return None
 
+def download_blurred_art(item, url):
+    """
+    Downloads the tiny pre-blurred art of an item into memory.
+
+    :param item: Plex media object.
+    :param url: URL from plex_adapter.blurred_art_url().
+    :return: PIL Image object, or None so the canvas is blurred locally.
+    """
+    try:
+        response = http_client.get(url, timeout=10)
+        if response.status_code == 200:
+            return Image.open(BytesIO(response.content))
+        debug and print(f"Failed to retrieve blurred art for {item.title}. Status: {response.status_code}")
+    except Exception as e:
+        debug and print(f"Exception downloading blurred art for {item.title}: {e}")
+    return None
+
+def info_text_for_item(item, media_type):
+    """
+    Builds the info line shown under the logo: year, genres, duration or seasons,
+    content rating and rating.
+
+    :param item: Plex media item (movie or show).
+    :param media_type: 'movie' or 'tv'.
+    :return: Info text.
+    """
+    if media_type == 'movie':
+        max_genres = 3
+        genres_list = [genre.tag for genre in item.genres][:max_genres]
+        genres_text = ', '.join(genres_list)
+        rating = getattr(item, "audienceRating", None) or getattr(item, "rating", None) or ""
+        rating_text = f" IMDb: {rating}" if rating else ""
+        duration = getattr(item, "duration", None)
+        if duration:
+            duration_hours = duration // (60 * 60 * 1000)
+            duration_minutes = (duration // (60 * 1000)) % 60
+            duration_text = f"{duration_hours}h {duration_minutes}min"
+        else:
+            duration_text = ""
+        contentrating = getattr(item, "contentRating", "")
+        contentrating_text = f" {contentrating}" if contentrating else ""
+
+        info_parts = [str(item.year)]
+
+        if genres_text:
+            info_parts.append(genres_text)
+
+        if duration_text:
+            info_parts.append(duration_text)
+
+        if contentrating_text:
+            info_parts.append(contentrating_text)
+
+        if rating_text:
+            info_parts.append(rating_text)
+
+        return "  •  ".join(info_parts)
+    else:
+        max_genres = 3
+        genres_list = [genre.tag for genre in item.genres][:max_genres]
+        genres_text = ', '.join(genres_list)
+        rating = getattr(item, "audienceRating", None) or getattr(item, "rating", None) or ""
+        rating_text = f"IMDb: {rating}" if rating else ""
+        contentrating = getattr(item, "contentRating", None) or ""
+        contentrating_text = contentrating if contentrating else ""
+        seasons_count = plex_adapter.season_count(item)
+        seasons_text = f"{seasons_count} Season" if seasons_count == 1 else f"{seasons_count} Seasons" if seasons_count else ""
+
+        info_parts = [str(item.year)]
+
+        if genres_text:
+            info_parts.append(genres_text)
+
+        if seasons_text:
+            info_parts.append(seasons_text)
+
+        if contentrating_text:
+            info_parts.append(contentrating_text)
+
+        if rating_text:
+            info_parts.append(rating_text)
+
+        return "  •  ".join(info_parts)
+
 def generate_background_for_item(item, media_type, group_type='',
                                  base_background=None, overlay=None,
-                                 plex_logo=None, target_folder=None):
+                                 render_pool=None, target_folder=None):
     """
-    Generates a customized background image for a given Plex media item (movie or show).
-    Downloads the art directly into memory, applies overlays, adds metadata text, and saves the final image.
+    Downloads the art, clearLogo and blurred art of a Plex media item (movie or show)
+    into memory, reads the metadata shown on the background, and hands the drawing
+    over to a render worker. Everything that talks to Plex happens here, in the
+    parent process, so the politeness delay between items still applies.
 
     :param item: Plex media item (movie or show).
     :param media_type: 'movie' or 'tv'.
     :param group_type: Category label like 'aired', 'added', or 'random' (for custom text).
     :param base_background: Preloaded background base image.
     :param overlay: Preloaded overlay image.
-    :param plex_logo: Preloaded Plex logo image.
+    :param render_pool: Executor from create_render_pool() running render_background().
     :param target_folder: Folder to save the background image to (defaults to current background_dir).
+    :return: Future of the render, or None if the item could not be fetched.
     """
 
     if target_folder is None:
@@ -431,102 +533,154 @@ def generate_background_for_item(item, media_type, group_type='',
     # Ensure the target folder exists
     os.makedirs(target_folder, exist_ok=True)
 
-    background_url = item.artUrl
+    # Art is scaled by Plex to the size it is drawn at, unless original_art is set
+    background_url = plex_adapter.art_url(item, width=3000, original=original_art)
     if not background_url:
         debug and print(f"No background art URL for {item.title}")
-        return
+        return None
+
+    # Tiny art blurred by Plex for the canvas, local blur when disabled or unavailable
+    blurred_url = server_blur and plex_adapter.blurred_art_url(item)
+    if blurred_url:
+        blur_call = (background_url, download_blurred_art, item, blurred_url)
+    else:
+        blur_call = (background_url, lambda: None)
 
     try:
-        # Download the background image from Plex
-        response = requests.get(background_url, timeout=10)
+        # Download the background image from Plex, the clearLogo and the blurred art at the same time
+        response, logo_image, blurred_image = http_client.fan_out([
+            (background_url, lambda: http_client.get(background_url, timeout=10)),
+            (background_url, download_logo_in_memory, item),
+            blur_call,
+        ])
         response.raise_for_status()
 
-        # Load image directly from bytes into memory
-        image = Image.open(BytesIO(response.content))
-
         # Safe filename
         filename_safe_title = unicodedata.normalize('NFKD', item.title).encode('ASCII', 'ignore').decode('utf-8')
         filename_safe_title = clean_filename(filename_safe_title)
 
-        # Save into target_folder instead of background_dir
-        background_filename = os.path.join(target_folder, f"{filename_safe_title}.jpg")
-
-        # Make copies of cached base background and overlay
-        canvas = generate_background_fast(image)
+        # Plex objects stay in this process, the worker only gets plain values and images
+        job = {
+            'title': item.title,
+            'summary': item.summary,
+            'info_text': info_text_for_item(item, media_type),
+            'group_type': group_type,
+            'art': response.content,  # Still encoded, decoding is left to the worker
+            'logo': logo_image,
+            'blurred': blurred_image,
+            'filename': os.path.join(target_folder, f"{filename_safe_title}.jpg"),
+        }
+    except requests.exceptions.HTTPError as e:
+        print(f"Failed to download background for {item.title}: HTTP error {e}")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"Error downloading background for {item.title}: {e}")
+        return None
+    except Exception as e:
+        print(f"An error occurred while processing {item.title}: {e}")
+        return None
 
+    try:
+        return render_pool.submit(render_background, job)
+    except BrokenProcessPool as e:
+        print(f"[ERROR] Could not queue the background of {item.title}, the render pool is broken: {e}")
+        return None
 
-        # Prepare to draw
-        draw = ImageDraw.Draw(canvas)
+# === Render Workers ===
 
-        # Load fonts
-        try:
-            font_title = ImageFont.truetype(truetype_path, size=190)
-            font_info = ImageFont.truetype(truetype_path, size=55)
-            font_summary = ImageFont.truetype(truetype_path, size=50)
-            font_custom = ImageFont.truetype(truetype_path, size=60)
-        except (OSError, IOError) as e:
-            print(f"[ERROR] Stopped background generation. Failed to load font from '{truetype_path}': {e}")
-            return  # Exit the function early; image generation cannot proceed without fonts
+# Resources of the current render worker, loaded once by init_render_worker()
+render_state = {}
 
-        # Info text
-        if media_type == 'movie':
-            max_genres = 3
-            genres_list = [genre.tag for genre in item.genres][:max_genres]
-            genres_text = ', '.join(genres_list)
-            rating = getattr(item, "audienceRating", None) or getattr(item, "rating", None) or ""
-            rating_text = f" IMDb: {rating}" if rating else ""
-            duration = getattr(item, "duration", None)
-            if duration:
-                duration_hours = duration // (60 * 60 * 1000)
-                duration_minutes = (duration // (60 * 1000)) % 60
-                duration_text = f"{duration_hours}h {duration_minutes}min"
-            else:
-                duration_text = ""
-            contentrating = getattr(item, "contentRating", "")
-            contentrating_text = f" {contentrating}" if contentrating else ""
+def init_render_worker(font_path, plex_logo):
+    """
+    Initializer of the render worker processes. Loads the fonts, the Plex logo and
+    the vignette mask of 16:9 art once, instead of once per background.
 
-            info_parts = [str(item.year)]
+    :param font_path: Path of the TTF font used for every text.
+    :param plex_logo: Plex logo image.
+    """
+    try:
+        render_state['fonts'] = {
+            'title': ImageFont.truetype(font_path, size=190),
+            'info': ImageFont.truetype(font_path, size=55),
+            'summary': ImageFont.truetype(font_path, size=50),
+            'custom': ImageFont.truetype(font_path, size=60),
+        }
+    except (OSError, IOError) as e:
+        print(f"[ERROR] Failed to load font from '{font_path}': {e}")
+        render_state['fonts'] = None
+    render_state['plex_logo'] = plex_logo.convert('RGBA')
+    render_state['masks'] = {}
+    vignette_mask(int(3000 * 9 / 16), 3000)
+
+def vignette_mask(h, w):
+    """
+    Returns the bottom-left vignette mask of the resized art, computed once per size
+    in each worker. Most art is 16:9, so the same mask is reused for nearly every item.
+    """
+    masks = render_state.setdefault('masks', {})
+    if (h, w) not in masks:
+        masks[(h, w)] = vignette_side(h, w, fade_ratio=0.3, fade_power=2.5, position="bottom-left")
+    return masks[(h, w)]
 
-            if genres_text:
-                info_parts.append(genres_text)
+def create_render_pool(plex_logo):
+    """
+    Starts the process pool that draws the backgrounds, see init_render_worker().
 
-            if duration_text:
-                info_parts.append(duration_text)
+    :param plex_logo: Plex logo image, handed to every worker once.
+    """
+    # Workers are spawned rather than forked: the first submit happens while other
+    # threads (HTTP pools, logging) may hold locks a forked child would inherit
+    return ProcessPoolExecutor(
+        max_workers=render_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_render_worker,
+        initargs=(truetype_path, plex_logo),
+    )
 
-            if contentrating_text:
-                info_parts.append(contentrating_text)
+def report_renders(renders):
+    """
+    Waits for submitted renders and prints the ones that failed outside of
+    render_background(), e.g. a worker killed mid-render or a job that could not be pickled.
 
-            if rating_text:
-                info_parts.append(rating_text)
+    :param renders: Dict of render futures to item titles.
+    """
+    for future in as_completed(renders):
+        if future.exception() is not None:
+            print(f"[ERROR] Rendering the background of {renders[future]} failed: {future.exception()}")
 
-            info_text = "  •  ".join(info_parts)
-        else:
-            max_genres = 3
-            genres_list = [genre.tag for genre in item.genres][:max_genres]
-            genres_text = ', '.join(genres_list)
-            rating = getattr(item, "audienceRating", None) or getattr(item, "rating", None) or ""
-            rating_text = f"IMDb: {rating}" if rating else ""
-            contentrating = getattr(item, "contentRating", None) or ""
-            contentrating_text = contentrating if contentrating else ""
-            seasons = getattr(item, "seasons", lambda: [])()
-            seasons_count = len(seasons)
-            seasons_text = f"{seasons_count} Season" if seasons_count == 1 else f"{seasons_count} Seasons" if seasons_count else ""
+def render_background(job):
+    """
+    Draws and saves a background from a job built by generate_background_for_item().
+    Runs in a render worker, where it only does CPU work and never talks to Plex.
 
-            info_parts = [str(item.year)]
+    :param job: Dict with the texts, the encoded art, the clearLogo and blurred art images,
+        and the output filename.
+    """
+    title = job['title']
+    try:
+        fonts = render_state['fonts']
+        if fonts is None:
+            print(f"[ERROR] Stopped background generation for {title}. No font could be loaded.")
+            return  # Image generation cannot proceed without fonts
+        font_title = fonts['title']
+        font_info = fonts['info']
+        font_summary = fonts['summary']
+        font_custom = fonts['custom']
+        plex_logo = render_state['plex_logo']
+        logo_image = job['logo']
 
-            if genres_text:
-                info_parts.append(genres_text)
+        # Load image directly from bytes into memory
+        image = Image.open(BytesIO(job['art']))
 
-            if seasons_text:
-                info_parts.append(seasons_text)
+        # Make copies of cached base background and overlay
+        canvas = generate_background_fast(image, blurred_img=job['blurred'])
 
-            if contentrating_text:
-                info_parts.append(contentrating_text)
 
-            if rating_text:
-                info_parts.append(rating_text)
+        # Prepare to draw
+        draw = ImageDraw.Draw(canvas)
 
-            info_text = "  •  ".join(info_parts)
+        info_text = job['info_text']
 
         # Summary text
 
@@ -537,7 +691,7 @@ def generate_background_for_item(item, media_type, group_type='',
         summary_pixel_width = max_summary_width if max_summary_width is not None else 2100
 
         # Truncate and wrap summary text
-        summary_text, was_truncated = truncate_summary(item.summary, summary_max_chars)
+        summary_text, was_truncated = truncate_summary(job['summary'], summary_max_chars)
         wrapped_summary_lines = wrap_text_by_pixel_width(
             summary_text,
             font_summary,
@@ -550,6 +704,7 @@ def generate_background_for_item(item, media_type, group_type='',
         wrapped_summary = "\n".join(wrapped_summary_lines)
 
         # Custom label text, uses the user-defined custom text options
+        group_type = job['group_type']
         if group_type == 'added':
             custom_text = added_label
         elif group_type == 'aired':
@@ -611,14 +766,13 @@ def generate_background_for_item(item, media_type, group_type='',
         canvas.paste(plex_logo, (logo_x, logo_y), plex_logo)
 
         # Logo or fallback title
-        logo_image = download_logo_in_memory(item)
         if logo_image:
             logo_resized = resize_logo(logo_image, 1300, 400).convert('RGBA')
             logo_position = (210, info_position[1] - logo_resized.height - 25)
             canvas.paste(logo_resized, logo_position, logo_resized)
         else:
             title_position = (200, 420)
-            title_text, _ = truncate_summary(item.title, 30)
+            title_text, _ = truncate_summary(title, 30)
             draw_text_with_shadow(
                 draw,
                 title_position,
@@ -631,21 +785,17 @@ def generate_background_for_item(item, media_type, group_type='',
 
         # Save final image
         canvas = canvas.convert('RGB')
-        canvas.save(background_filename)
-        print(f"Image saved: {background_filename}")
+        canvas.save(job['filename'])
+        print(f"Image saved: {job['filename']}")
 
-    except requests.exceptions.HTTPError as e:
-        print(f"Failed to download background for {item.title}: HTTP error {e}")
-    except requests.exceptions.RequestException as e:
-        print(f"Error downloading background for {item.title}: {e}")
     except Exception as e:
-        print(f"An error occurred while processing {item.title}: {e}")
+        print(f"An error occurred while processing {title}: {e}")
 
 def download_latest_media(order_by, limit, media_type,
                           target_folder=None,
                           base_background=None,
                           overlay=None,
-                          plex_logo=None):
+                          render_pool=None):
     """
     Downloads and processes the latest media items from Plex library.
 
@@ -653,9 +803,10 @@ def download_latest_media(order_by, limit, media_type,
         order_by (str): Criterion to order items by ('aired' or 'added').
         limit (int): Number of items to process.
         media_type (str): Type of media to fetch ('movie' or 'tv').
+        render_pool: Executor from create_render_pool() drawing the backgrounds.
 
     Returns:
-        None. Downloads and generates backgrounds for the selected media.
+        Dict of render futures to item titles, see report_renders().
     """
     if target_folder is None:
         target_folder = background_dir
@@ -671,135 +822,48 @@ def download_latest_media(order_by, limit, media_type,
         debug and print("[DEBUG] Series downloads disabled; skipping.")
         return
 
-    def sort_movies(movies, key_attr):
-        """
-        Sort movies based on a given datetime attribute.
-        """
-        filtered = [m for m in movies if getattr(m, key_attr) is not None]
-        return sorted(filtered, key=lambda x: getattr(x, key_attr), reverse=True)
-
-    def sort_shows(shows, key_attr):
-        """
-        Sort TV shows based on the latest episode's datetime attribute.
-        """
-        shows_with_dates = []
-        for show in shows:
-            episodes = show.episodes()
-            episodes_with_date = [ep for ep in episodes if getattr(ep, key_attr) is not None]
-            if episodes_with_date:
-                latest_episode = max(episodes_with_date, key=lambda ep: getattr(ep, key_attr))
-                shows_with_dates.append((show, getattr(latest_episode, key_attr)))
-        return [s[0] for s in sorted(shows_with_dates, key=lambda x: x[1], reverse=True)]
-
     if media_type == 'movie':
-        media_items = plex_instance.library.search(libtype='movie')
-        if order_by == 'aired':
-            media_sorted = sort_movies(media_items, 'originallyAvailableAt')
-        elif order_by == 'added':
-            media_sorted = sort_movies(media_items, 'addedAt')
-        else:
+        if order_by not in plex_adapter.SORT_FIELDS:
             print("Invalid order_by parameter. Please use 'aired' or 'added'.")
             return
+        # Sorted and limited by Plex, only the top items of each movie section are loaded
+        movie_sections = plex_adapter.library_sections(plex_instance, 'movie')
+        media_sorted = plex_adapter.newest_items(movie_sections, order_by, limit, fast=fast_listing)
 
     elif media_type == 'tv':
-        media_items = plex_instance.library.search(libtype='show')
-        if order_by == 'aired':
-            media_sorted = sort_shows(media_items, 'originallyAvailableAt')
-        elif order_by == 'added':
-            media_sorted = sort_shows(media_items, 'addedAt')
-        else:
+        if order_by not in plex_adapter.SORT_FIELDS:
             print("Invalid order_by parameter. Please use 'aired' or 'added'.")
             return
+        # Shows are ranked by their latest episode from one sorted episode listing
+        show_sections = plex_adapter.library_sections(plex_instance, 'show')
+        media_sorted = plex_adapter.newest_shows(show_sections, order_by, limit, fast=fast_listing)
     else:
         print("Invalid media_type parameter. Use 'movie' or 'tv'.")
         return
 
     debug and print(f"[DEBUG] Processing {len(media_sorted[:limit])} {media_type} items sorted by {order_by}")
 
+    renders = {}
     for item in media_sorted[:limit]:
-        generate_background_for_item(
+        future = generate_background_for_item(
             item,
             media_type,
             group_type=order_by,
             base_background=None,
             overlay=None,
-            plex_logo=plex_logo,
+            render_pool=render_pool,
             target_folder=target_folder
         )
+        if future is not None:
+            renders[future] = item.title
         time.sleep(plex_api_delay_seconds)
-
-def fetch_items(media_type, sort_type, count):
-    """
-    Fetch media items of a given type sorted by specified attribute.
-
-    Args:
-        media_type (str): 'movie' or 'show'.
-        sort_type (str): 'aired', 'added', or 'random'.
-        count (int): Number of items to fetch.
-
-    Returns:
-        list: Sorted/fetched media items.
-    """
-
-    # Ensure global plex_instance is initialized
-    initialize_plex_connection()
-
-    # Get sections relevant for the media type
-    if media_type == 'movie':
-        sections = [s for s in plex_instance.library.sections() if s.type == 'movie']
-    elif media_type == 'show':
-        sections = [s for s in plex_instance.library.sections() if s.type == 'show']
-    else:
-        print(f"[ERROR] Invalid media_type: {media_type}. Expected 'movie' or 'show'.")
-        return []
-
-    # Aggregate all items from all sections
-    items = []
-    for section in sections:
-        items.extend(section.search())
-
-    # Sort/filter items based on sort_type
-    if sort_type == 'aired':
-        filtered = [i for i in items if getattr(i, 'originallyAvailableAt', None) is not None]
-        sorted_items = sorted(filtered, key=lambda x: x.originallyAvailableAt, reverse=True)
-    elif sort_type == 'added':
-        filtered = [i for i in items if getattr(i, 'addedAt', None) is not None]
-        sorted_items = sorted(filtered, key=lambda x: x.addedAt, reverse=True)
-    elif sort_type == 'random':
-        # Random sample (no sort needed)
-        return random.sample(items, min(count, len(items)))
-    else:
-        return []
-
-    return sorted_items[:count]
-
-def dedup(items, seen):
-    """
-    Remove duplicates from a list of media items based on their unique ratingKey.
-
-    Args:
-        items (list): List of media items to filter.
-        seen (set): A set of ratingKeys already encountered; used to track duplicates across multiple calls.
-
-    Returns:
-        list: A new list containing only unique media items not previously seen.
-
-    Notes:
-    The function updates the 'seen' set with the ratingKeys of newly returned items.
-    This helps avoid duplicates when fetching items in multiple batches.
-    """
-    unique_items = []
-    for item in items:
-        if item.ratingKey not in seen:
-            seen.add(item.ratingKey)
-            unique_items.append(item)
-    return unique_items
+    return renders
 
 def get_mixed_media(limit, download_movies=True, download_series=True, seen=None):
     """
     Fetches a mixed collection of Plex media items (movies or shows), split evenly
-    across three groups: 'aired', 'added', and 'random'. Handles deduplication and
-    adaptive overfetching to ensure enough unique items per group.
+    across three groups: 'aired', 'added', and 'random'. Every group is picked from
+    one library snapshot and deduplicated against the others in memory.
 
     Args:
         limit (int): Number of items to fetch per media type.
@@ -834,33 +898,19 @@ def get_mixed_media(limit, download_movies=True, download_series=True, seen=None
     else:
         media_type = 'movie'  # Fallback: assume movies only if ambiguous
 
+    # One snapshot of the library per run, every group is picked from it in memory.
+    # The sorted groups keep adjusted_limit items, enough to refill a group whose
+    # top items were already picked by another group.
+    snapshot = plex_adapter.LibrarySnapshot(plex_instance, media_type, depth=adjusted_limit, fast=fast_listing)
+
     # Loop through each group type
     for group_type in ['aired', 'added', 'random']:
-        collected = []
-        attempts = 0
-        max_attempts = 3
-        overfetch_factor = 1.5
-
-        while len(collected) < per_group and attempts < max_attempts:
-            overfetch_count = int(per_group * overfetch_factor)
-            fetched = fetch_items(media_type, group_type, overfetch_count)
-            unique = dedup(fetched, seen)
-            new_items = [item for item in unique if item not in collected]
-            collected.extend(new_items)
-            attempts += 1
-            overfetch_factor *= 0.9  # Slightly decrease each attempt
-
-            debug and print(f"[DEBUG] [{media_type.upper()}][{group_type.upper()}] Attempt {attempts}: "
-                            f"Fetched {len(fetched)}, Unique {len(unique)}, "
-                            f"New {len(new_items)}, Total Collected {len(collected)}")
-
-            if len(new_items) == 0:
-                break  # No more new items likely available
+        collected = snapshot.pick(group_type, per_group, seen)
 
         if len(collected) < per_group:
             debug and print(f"[DEBUG] ⚠️ Only {len(collected)} {media_type}s available for group '{group_type}' (expected {per_group})")
 
-        final_items_by_group[group_type] = collected[:per_group]
+        final_items_by_group[group_type] = collected
 
         debug and print(f"[DEBUG] [{media_type.upper()}][{group_type.upper()}] Final count: {len(final_items_by_group[group_type])}")
         for item in final_items_by_group[group_type]:
@@ -883,56 +933,74 @@ def main_process(order_by, limit, download_movies, download_series,
     # Ensure global plex_instance is initialized
     initialize_plex_connection()
 
-    if order_by == 'mix':
-        # Mixed mode: fetch per-type to respect limit for each
-        if download_movies:
-            movie_seen = set()
-            movie_items = get_mixed_media(limit, download_movies=True, download_series=False, seen=movie_seen)
-            for item, group_type in movie_items:
-                generate_background_for_item(
-                    item,
-                    media_type='movie',
-                    group_type=group_type,
+    # Count the metadata fetches plexapi makes behind our back while rendering
+    reload_counter = plex_adapter.count_reloads() if debug else None
+
+    # Items are downloaded here one at a time and drawn by the render workers in parallel
+    renders = {}
+    with create_render_pool(plex_logo) as render_pool:
+        if order_by == 'mix':
+            # Mixed mode: fetch per-type to respect limit for each
+            if download_movies:
+                movie_seen = set()
+                movie_items = get_mixed_media(limit, download_movies=True, download_series=False, seen=movie_seen)
+                for item, group_type in movie_items:
+                    future = generate_background_for_item(
+                        item,
+                        media_type='movie',
+                        group_type=group_type,
+                        base_background=None,
+                        overlay=None,
+                        render_pool=render_pool,
+                        target_folder=background_dir
+                    )
+                    if future is not None:
+                        renders[future] = item.title
+                    # Only the Plex downloads are spaced out, the renders keep running meanwhile
+                    time.sleep(plex_api_delay_seconds)
+
+            if download_series:
+                show_seen = set()
+                show_items = get_mixed_media(limit, download_movies=False, download_series=True, seen=show_seen)
+                for item, group_type in show_items:
+                    future = generate_background_for_item(
+                        item,
+                        media_type='tv',
+                        group_type=group_type,
+                        base_background=None,
+                        overlay=None,
+                        render_pool=render_pool,
+                        target_folder=background_dir
+                    )
+                    if future is not None:
+                        renders[future] = item.title
+                    time.sleep(plex_api_delay_seconds)
+
+        else:
+            # Single mode: download movies and/or series based on order_by parameter
+            if download_movies:
+                renders.update(download_latest_media(
+                    order_by, limit, 'movie',
+                    target_folder=background_dir,
                     base_background=None,
-                    overlay=None,
-                    plex_logo=plex_logo,
-                    target_folder=background_dir
-                )
-                time.sleep(plex_api_delay_seconds)
-
-        if download_series:
-            show_seen = set()
-            show_items = get_mixed_media(limit, download_movies=False, download_series=True, seen=show_seen)
-            for item, group_type in show_items:
-                generate_background_for_item(
-                    item,
-                    media_type='tv',
-                    group_type=group_type,
+                    overlay=overlay,
+                    render_pool=render_pool
+                ) or {})
+            if download_series:
+                renders.update(download_latest_media(
+                    order_by, limit, 'tv',
+                    target_folder=background_dir,
                     base_background=None,
-                    overlay=None,
-                    plex_logo=plex_logo,
-                    target_folder=background_dir
-                )
-                time.sleep(plex_api_delay_seconds)
+                    overlay=overlay,
+                    render_pool=render_pool
+                ) or {})
 
-    else:
-        # Single mode: download movies and/or series based on order_by parameter
-        if download_movies:
-            download_latest_media(
-                order_by, limit, 'movie',
-                target_folder=background_dir,
-                base_background=None,
-                overlay=overlay,
-                plex_logo=plex_logo
-            )
-        if download_series:
-            download_latest_media(
-                order_by, limit, 'tv',
-                target_folder=background_dir,
-                base_background=None,
-                overlay=overlay,
-                plex_logo=plex_logo
-            )
+        # Wait for the remaining renders and report the ones the pool lost
+        report_renders(renders)
+
+    if reload_counter is not None:
+        reload_counter.stop()
+        print(f"[DEBUG] Implicit plexapi reloads this run: {reload_counter.summary()}")
 
 # === Main Execution Logic ===
 
@@ -957,41 +1025,66 @@ try:
 except (NameError, ValueError, TypeError):
     plex_logo_horizontal_offset = 0  # Default horizontal shift
 
-# Attempt to download the user-configured font
-debug and print(f"[DEBUG] Attempting to download user-configured font: {user_font_name}")
-font_downloaded = download_font(user_font_url, user_font_name)
-
-# If the user-configured font download succeeds, set truetype_path
-if font_downloaded:
-    truetype_path = user_font_name
+def resolve_font():
+    """
+    Downloads the user-configured font, or the first fallback font that can be downloaded.
 
-# Step 2: If user-configured font fails, and user font isn't the same as default font
-# fall back to the default font
-if not font_downloaded and not (
-    user_font_url == fallback_font_url and user_font_name == fallback_font_path
-):
-    print("[ERROR] User font download failed. Falling back to default font...")
-    font_downloaded = download_font(fallback_font_url, fallback_font_path)
+    :return: Path of the font to use, or None if no font is available.
+    """
+    # Attempt to download the user-configured font
+    debug and print(f"[DEBUG] Attempting to download user-configured font: {user_font_name}")
+    font_downloaded = download_font(user_font_url, user_font_name)
 
-    if font_downloaded:
-        truetype_path = fallback_font_path
+    # If the user-configured font download succeeds, set truetype_path
+    truetype_path = user_font_name if font_downloaded else None
 
-# Step 3: If default font also fails, try additional fallback fonts
-if not font_downloaded:
-    for fallback in additional_fallback_fonts:
-        print(f"[ERROR] Default font download failed. Trying additional fallback font: {fallback['path']}")
-        font_downloaded = download_font(fallback['url'], fallback['path'])
+    # Step 2: If user-configured font fails, and user font isn't the same as default font
+    # fall back to the default font
+    if not font_downloaded and not (
+        user_font_url == fallback_font_url and user_font_name == fallback_font_path
+    ):
+        print("[ERROR] User font download failed. Falling back to default font...")
+        font_downloaded = download_font(fallback_font_url, fallback_font_path)
 
         if font_downloaded:
-            truetype_path = fallback['path']
-            break
+            truetype_path = fallback_font_path
 
-# If no font is found, print an error and exit
-if not font_downloaded:
-    print("[ERROR] No valid font available. The script cannot proceed without a font.")
-    exit(1)  # Exit the script if no font is available
+    # Step 3: If default font also fails, try additional fallback fonts
+    if not font_downloaded:
+        for fallback in additional_fallback_fonts:
+            print(f"[ERROR] Default font download failed. Trying additional fallback font: {fallback['path']}")
+            font_downloaded = download_font(fallback['url'], fallback['path'])
+
+            if font_downloaded:
+                truetype_path = fallback['path']
+                break
+
+    return truetype_path
 
 if __name__ == "__main__":
+    # Validate that either hardcoded values or environment variables are set
+    if not baseurl or baseurl.strip() == '' or not token or token.strip() == '':
+        print("ERROR: Both Plex server base URL and API token are required.")
+        print("Please set one of the following options:")
+        print("1. Uncomment and set your hardcoded baseurl and token in the script.")
+        print("2. Set BASEURL and TOKEN as environment variables in the .env file.")
+        exit(1)
+
+    # Open the connection to the Plex server while the fonts are being prepared
+    http_client.preconnect(baseurl)
+
+    truetype_path = resolve_font()
+    # If no font is found, print an error and exit
+    if truetype_path is None:
+        print("[ERROR] No valid font available. The script cannot proceed without a font.")
+        exit(1)  # Exit the script if no font is available
+
+    # Create a directory to save the backgrounds and clear its contents
+    # Done here rather than at import, render workers may import this module again
+    if os.path.exists(background_dir):
+        shutil.rmtree(background_dir)
+    os.makedirs(background_dir, exist_ok=True)
+
     # Load overlay resources once at module load
     BASE_PATH = os.path.dirname(__file__)
     try:
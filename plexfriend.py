@@ -10,14 +10,19 @@ import unicodedata
 from io import BytesIO
 from typing import Tuple
 import textwrap
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 # === Third-Party Imports ===
-import requests
 from PIL import Image, ImageDraw, ImageFont
-from plexapi.myplex import MyPlexAccount
 from dotenv import load_dotenv
 load_dotenv(verbose=True)
 
+# === Local Imports ===
+import http_client
+import plex_adapter
+
 # === User Configurable Options ===
 PLEX_TOKEN = locals().get('token', os.getenv('PLEX_TOKEN'))
 TARGET_FRIEND = None  # e.g. "Alice Dupont"
@@ -26,6 +31,8 @@ download_movies = True
 download_series = True
 limit = 5
 debug = False
+fast_listing = True  # light JSON listings, only picked items become plexapi objects
+original_art = False  # full-size art instead of pre-sized by the Plex photo transcoder
 
 logo_variant = 'white'
 plex_logo_horizontal_offset = 0
@@ -49,19 +56,18 @@ metadata_color = 'white'
 shadow_color   = 'black'
 shadow_offset  = 2
 
-plex_api_delay_seconds = 1.0
+plex_api_delay_seconds = 1.0  # pause between items, per friend server
+friend_workers = 4  # friend servers worked on at once
+render_workers = None  # render processes shared by all friends, None uses every CPU core
 
-# Prepare output directory
+# Output directory, cleared when the script starts
 background_dir = 'plexfriend_backgrounds'
-if os.path.exists(background_dir):
-    shutil.rmtree(background_dir)
-os.makedirs(background_dir, exist_ok=True)
 
 # === Download Font ===
 def download_font(url, path):
     try:
         if not os.path.exists(path):
-            r = requests.get(url, timeout=10)
+            r = http_client.get(url, timeout=10)
             if r.status_code == 200:
                 with open(path, 'wb') as f: f.write(r.content)
                 return True
@@ -72,20 +78,14 @@ def download_font(url, path):
 
 # === Discover Friend Servers ===
 def get_friend_servers(token, target_friend=None):
-    account = MyPlexAccount(token=token)
-    friend_map = {u.id: u.title for u in account.users()}
+    # cached discovery first, plex.tv is refreshed in the background (see plex_cache)
     servers = {}
-    for res in account.resources():
-        if res.provides == 'server' and not res.owned:
-            owner = friend_map.get(res.ownerId)
-            if not owner or (target_friend and owner != target_friend):
-                continue
-            try:
-                plex = res.connect()
-                servers[owner] = plex
-                print(f"[INFO] Connected to {owner}'s server: {res.name}")
-            except Exception as e:
-                print(f"[WARN] Could not connect to {owner}: {e}")
+    for owner, name, plex in plex_adapter.friend_servers(token, target_friend):
+        if plex is None:
+            print(f"[WARN] Could not connect to {owner}: no connection answered in time")
+            continue
+        servers[owner] = plex
+        print(f"[INFO] Connected to {owner}'s server: {name}")
     return servers
 
 # === Utilities ===
@@ -137,9 +137,10 @@ def draw_text_with_shadow(draw, pos, text, font, fill, shadow, offset=(2,2)):
     draw.text((x, y), text, font=font, fill=fill)
 
 def download_logo_in_memory(item, baseurl, token):
-    url = f"{baseurl}/library/metadata/{item.ratingKey}/clearLogo?X-Plex-Token={token}"
+    url = plex_adapter.clear_logo_url(item, baseurl, token)
+    if url is None: return None  # metadata says there is no clearLogo
     try:
-        r = requests.get(url, timeout=10)
+        r = http_client.get(url, timeout=10)
         if r.status_code == 200:
             return Image.open(BytesIO(r.content))
     except:
@@ -147,78 +148,100 @@ def download_logo_in_memory(item, baseurl, token):
     return None
 
 # === Core Image Processing ===
-def generate_background_for_item(item, media_type, group_type,
-                                 base_background, overlay, plex_logo,
-                                 target_folder):
-    # ensure assets
-    if not (base_background and overlay and plex_logo):
-        print("[ERROR] Missing background/overlay/logo")
-        return
-
+def generate_background_for_item(item, media_type, group_type, render_pool, target_folder, friend, plex):
     # prepare folder
     os.makedirs(target_folder, exist_ok=True)
 
     # fetch art
-    art_url = item.artUrl
-    if not art_url: return
+    art_url = plex_adapter.art_url(item, height=1500, original=original_art)
+    if not art_url: return None
     try:
-        r = requests.get(art_url, timeout=10); r.raise_for_status()
-        art = Image.open(BytesIO(r.content))
+        # art and clearLogo are downloaded together
+        r, clogo = http_client.fan_out([
+            (art_url, lambda: http_client.get(art_url, timeout=10)),
+            (art_url, download_logo_in_memory, item, plex._baseurl, plex._token),
+        ])
+        r.raise_for_status()
     except:
-        return
-
+        return None
 
+    # metadata text, read here as plexapi objects stay in this process
+    if media_type=='movie':
+        genres = [g.tag for g in item.genres][:3]
+        dur    = item.duration and f"{item.duration//3600000}h {(item.duration//60000)%60}min"
+        rating = item.audienceRating or item.rating or ''
+        parts  = [str(item.year)] + genres + ([dur] if dur else []) + ([item.contentRating] if item.contentRating else []) + ([f"IMDb: {rating}"] if rating else [])
+    else:
+        genres = [g.tag for g in item.genres][:3]
+        seasons= plex_adapter.season_count(item)
+        parts  = [str(item.year)] + genres + ([f"{seasons} Season" if seasons==1 else f"{seasons} Seasons"]) + ([item.contentRating] if item.contentRating else []) + ([f"IMDb: {item.audienceRating or item.rating}"])
 
     # filename
     today = datetime.today().date().strftime('%Y%m%d')
     safe = unicodedata.normalize('NFKD', item.title).encode('ASCII','ignore').decode()
     safe = clean_filename(safe) + "_" + today
-    out_path = os.path.join(target_folder,  f"{safe}.jpg")
 
-    # compose canvas
-    canvas = base_background.copy()
-    over   = overlay.copy()
-    art    = resize_image(art, 1500)
-    canvas.paste(art, (1175,0)); canvas.paste(over,(1175,0),over)
-    draw = ImageDraw.Draw(canvas)
+    # drawing is left to the shared render pool
+    job = {
+        'title': item.title, 'summary': item.summary, 'info_text': "  •  ".join(parts),
+        'group_type': group_type, 'friend': friend,
+        'art': r.content, 'clogo': clogo,
+        'out_path': os.path.join(target_folder,  f"{safe}.jpg"),
+    }
+    try:
+        return render_pool.submit(render_background, job)
+    except BrokenProcessPool as e:
+        print(f"[ERROR] Could not queue {item.title}, the render pool is broken: {e}")
+        return None
+
+# === Render Workers ===
+render_state = {}  # fonts and images of this worker process, see init_render_worker()
 
-    # load fonts
+def init_render_worker(font_path, base_background, overlay, plex_logo):
+    # loaded once per worker instead of once per background
     try:
-        ft_title   = ImageFont.truetype(truetype_path, size=190)
-        ft_info    = ImageFont.truetype(truetype_path, size=55)
-        ft_summary = ImageFont.truetype(truetype_path, size=50)
-        ft_custom  = ImageFont.truetype(truetype_path, size=60)
+        render_state['fonts'] = [ImageFont.truetype(font_path, size=size) for size in (190, 55, 50, 60)]
+    except OSError as e:
+        print(f"[ERROR] Failed to load font from '{font_path}': {e}")
+        render_state['fonts'] = None
+    render_state['images'] = (base_background, overlay, plex_logo)
+
+def render_background(job):
+    try:
+        draw_background(job)
     except Exception as e:
-        print(f"[ERROR] Font load: {e}")
+        print(f"[ERROR] Could not render {job['title']}: {e}")
+
+def draw_background(job):
+    if render_state['fonts'] is None:
+        print(f"[ERROR] Skipped {job['title']}, no font could be loaded.")
         return
+    base_background, overlay, plex_logo = render_state['images']
+    ft_title, ft_info, ft_summary, ft_custom = render_state['fonts']
+    clogo = job['clogo']
 
-    # metadata text
-    if media_type=='movie':
-        genres = [g.tag for g in item.genres][:3]
-        dur    = item.duration and f"{item.duration//3600000}h {(item.duration//60000)%60}min"
-        rating = item.audienceRating or item.rating or ''
-        parts  = [str(item.year)] + genres + ([dur] if dur else []) + ([item.contentRating] if item.contentRating else []) + ([f"IMDb: {rating}"] if rating else [])
-    else:
-        genres = [g.tag for g in item.genres][:3]
-        seasons= len(item.seasons())
-        parts  = [str(item.year)] + genres + ([f"{seasons} Season" if seasons==1 else f"{seasons} Seasons"]) + ([item.contentRating] if item.contentRating else []) + ([f"IMDb: {item.audienceRating or item.rating}"])
-    info_text = "  •  ".join(parts)
+    # compose canvas
+    canvas = base_background.copy()
+    over   = overlay.copy()
+    art    = resize_image(Image.open(BytesIO(job['art'])), 1500)
+    canvas.paste(art, (1175,0)); canvas.paste(over,(1175,0),over)
+    draw = ImageDraw.Draw(canvas)
 
     # draw info
-    draw_text_with_shadow(draw, (210,650), info_text, ft_info, info_color, shadow_color, (shadow_offset,)*2)
+    draw_text_with_shadow(draw, (210,650), job['info_text'], ft_info, info_color, shadow_color, (shadow_offset,)*2)
 
     # summary: truncate then wrap
     max_chars  = max_summary_chars or 150
     max_pixels = max_summary_width or 1800
-    summary, _ = truncate_summary(item.summary, max_chars)
+    summary, _ = truncate_summary(job['summary'], max_chars)
     lines      = wrap_text_by_pixel_width(summary, ft_summary, max_pixels, draw)
     wrapped    = "\n".join(lines)
     draw_text_with_shadow(draw, (210,730), wrapped, ft_summary, summary_color, shadow_color, (shadow_offset,)*2)
 
 
     # label
-    label_map = {'added':added_label + " " + friend + "'s", 'aired':aired_label, 'random':random_label}
-    lbl = label_map.get(group_type, default_label)
+    label_map = {'added':added_label + " " + job['friend'] + "'s", 'aired':aired_label, 'random':random_label}
+    lbl = label_map.get(job['group_type'], default_label)
     # position label + logo
     bbox = draw.textbbox((0,0), wrapped, font=ft_summary)
     y0  = 730 + (bbox[3]-bbox[1]) + 30
@@ -231,59 +254,79 @@ def generate_background_for_item(item, media_type, group_type,
     canvas.paste(plex_logo,(lx,ly),plex_logo)
 
     # clearLogo / fallback title
-    clogo = download_logo_in_memory(item, plex._baseurl, plex._token)
     if clogo:
         clogo = resize_logo(clogo,1300,400).convert('RGBA')
         canvas.paste(clogo,(210,650-clogo.height-25),clogo)
     else:
-        title, _ = truncate_summary(item.title,30)
+        title, _ = truncate_summary(job['title'],30)
         draw_text_with_shadow(draw,(200,420),title,ft_title,main_color,shadow_color,(shadow_offset,)*2)
 
     # save
-    canvas.convert('RGB').save(out_path)
-    print(f"Saved: {out_path}")
-
-# === Sorting Helpers ===
-def sort_movies(movies,k): return sorted([m for m in movies if getattr(m,k,None)], key=lambda x:getattr(x,k), reverse=True)
-def sort_shows(shows,k):
-    arr=[]
-    for s in shows:
-        eps=[e for e in s.episodes() if getattr(e,k,None)]
-        if eps: arr.append((s,max(eps,key=lambda e:getattr(e,k))))
-    return [s for s,_ in sorted(arr,key=lambda t:getattr(t[1],k),reverse=True)]
+    canvas.convert('RGB').save(job['out_path'])
+    print(f"Saved: {job['out_path']}")
 
 # === Download Latest Media ===
-def download_latest_media(plex,order,lim,typ,base_bg,over,logo,friend):
-    items = plex.library.search(libtype='movie' if typ=='movie' else 'show')
-    key   = 'originallyAvailableAt' if order=='aired' else 'addedAt'
-    sorted_items = (sort_movies if typ=='movie' else sort_shows)(items,key)[:lim]
+def download_latest_media(plex,order,lim,typ,friend,render_pool):
+    group = 'aired' if order=='aired' else 'added'
+    if typ=='movie':
+        # sorted and limited by Plex, only the top items of each section come back
+        sorted_items = plex_adapter.newest_items(plex_adapter.library_sections(plex,'movie'), group, lim, fast=fast_listing)
+    else:
+        # shows ranked by their latest episode from one sorted episode listing
+        sorted_items = plex_adapter.newest_shows(plex_adapter.library_sections(plex,'show'), group, lim, fast=fast_listing)
     odir = os.path.join(background_dir)
+    renders = {}  # render future -> item, reported in the entry point
     for itm in sorted_items:
-        generate_background_for_item(itm,typ,order,base_bg,over,logo,odir)
-        time.sleep(plex_api_delay_seconds)
+        future = generate_background_for_item(itm,typ,order,render_pool,odir,friend,plex)
+        if future: renders[future] = f"{itm.title} ({friend})"
+        time.sleep(plex_api_delay_seconds)  # politeness towards this friend's server only
+    return renders
 
 # === Main per-Friend ===
-def main_for_friend(plex,friend):
-    global truetype_path
-    if download_font(env_font_url,env_font_name):
-        truetype_path = env_font_name
+def main_for_friend(plex,friend,render_pool):
+    print(f"\n=== Processing {friend} ===")
+    renders = {}
+    if order_by=='mix':
+        if download_movies: renders.update(download_latest_media(plex,'added',limit,'movie',friend,render_pool))
+        if download_series: renders.update(download_latest_media(plex,'aired',limit,'show',friend,render_pool))
     else:
+        if download_movies: renders.update(download_latest_media(plex,order_by,limit,'movie',friend,render_pool))
+        if download_series: renders.update(download_latest_media(plex,order_by,limit,'show',friend,render_pool))
+    return renders
+
+# === Entry Point ===
+if __name__ == '__main__':
+    # cleared here rather than at import, render workers may import this module again
+    if os.path.exists(background_dir):
+        shutil.rmtree(background_dir)
+    os.makedirs(background_dir, exist_ok=True)
+    if not download_font(env_font_url,env_font_name):
         raise RuntimeError("Font download failed")
     BASE = os.path.dirname(__file__)
     bg   = Image.open(os.path.join(BASE,'bckg.png')).convert('RGBA')
     ov   = Image.open(os.path.join(BASE,'overlay.png')).convert('RGBA')
     logo_file = 'plexlogo_color.png' if logo_variant=='color' else 'plexlogo.png'
     plogo     = Image.open(os.path.join(BASE,logo_file)).convert('RGBA')
-    if order_by=='mix':
-        if download_movies: download_latest_media(plex,'added',limit,'movie',bg,ov,plogo,friend)
-        if download_series: download_latest_media(plex,'aired',limit,'show',bg,ov,plogo,friend)
-    else:
-        if download_movies: download_latest_media(plex,order_by,limit,'movie',bg,ov,plogo,friend)
-        if download_series: download_latest_media(plex,order_by,limit,'show',bg,ov,plogo,friend)
 
-# === Entry Point ===
-if __name__ == '__main__':
+    reload_counter = plex_adapter.count_reloads() if debug else None
     servers = get_friend_servers(PLEX_TOKEN, TARGET_FRIEND)
-    for friend, plex in servers.items():
-        print(f"\n=== Processing {friend} ===")
-        main_for_friend(plex, friend)
+    # friend servers are worked on at once, every render goes to one shared process pool
+    # workers are spawned, a fork from a busy thread could inherit a held lock and hang
+    with ProcessPoolExecutor(max_workers=render_workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=init_render_worker,
+                             initargs=(env_font_name, bg, ov, plogo)) as render_pool, \
+         ThreadPoolExecutor(max_workers=friend_workers) as friend_pool:
+        jobs = {friend_pool.submit(main_for_friend, plex, friend, render_pool): friend for friend, plex in servers.items()}
+        renders = {}
+        for job in as_completed(jobs):
+            if job.exception():
+                print(f"[ERROR] Could not process {jobs[job]}: {job.exception()}")
+            else:
+                renders.update(job.result())
+        # renders lost by the pool (killed worker, unpicklable job) are reported too
+        for render in as_completed(renders):
+            if render.exception():
+                print(f"[ERROR] Could not render {renders[render]}: {render.exception()}")
+    if reload_counter is not None:
+        reload_counter.stop()
+        print(f"[DEBUG] Implicit plexapi reloads this run: {reload_counter.summary()}")
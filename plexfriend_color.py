@@ -3,21 +3,24 @@
 # === Standard Library Imports ===
 import os
 import time
-from datetime import datetime
 import shutil
 import unicodedata
 from io import BytesIO
-from typing import Tuple
 import textwrap
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 # === Third-Party Imports ===
-import requests
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import numpy as np
-from plexapi.myplex import MyPlexAccount
 from dotenv import load_dotenv
 load_dotenv(verbose=True)
 
+# === Local Imports ===
+import http_client
+import plex_adapter
+
 # === User Configurable Options ===
 PLEX_TOKEN = locals().get('token', os.getenv('PLEX_TOKEN'))
 TARGET_FRIEND = None  # e.g. "Alice Dupont"
@@ -26,6 +29,9 @@ download_movies = True
 download_series = True
 limit = 5
 debug = False
+fast_listing = True  # light JSON listings, only picked items become plexapi objects
+original_art = False  # full-size art instead of pre-sized by the Plex photo transcoder
+server_blur = True  # Plex blurs a tiny copy of the art for the canvas, local blur otherwise
 
 logo_variant = 'white'
 plex_logo_horizontal_offset = 0
@@ -51,19 +57,18 @@ metadata_color = 'white'
 shadow_color   = 'black'
 shadow_offset  = 2
 
-plex_api_delay_seconds = 1.0
+plex_api_delay_seconds = 1.0  # pause between items, per friend server
+friend_workers = 4  # friend servers worked on at once
+render_workers = None  # render processes shared by all friends, None uses every CPU core
 
-# Prepare output directory
+# Output directory, cleared when the script starts
 background_dir = 'plexfriend_backgrounds'
-if os.path.exists(background_dir):
-    shutil.rmtree(background_dir)
-os.makedirs(background_dir, exist_ok=True)
 
 # === Download Font ===
 def download_font(url, path):
     try:
         if not os.path.exists(path):
-            r = requests.get(url, timeout=10)
+            r = http_client.get(url, timeout=10)
             if r.status_code == 200:
                 with open(path, 'wb') as f: f.write(r.content)
                 return True
@@ -74,20 +79,14 @@ def download_font(url, path):
 
 # === Discover Friend Servers ===
 def get_friend_servers(token, target_friend=None):
-    account = MyPlexAccount(token=token)
-    friend_map = {u.id: u.title for u in account.users()}
+    # cached discovery first, plex.tv is refreshed in the background (see plex_cache)
     servers = {}
-    for res in account.resources():
-        if res.provides == 'server' and not res.owned:
-            owner = friend_map.get(res.ownerId)
-            if not owner or (target_friend and owner != target_friend):
-                continue
-            try:
-                plex = res.connect()
-                servers[owner] = plex
-                print(f"[INFO] Connected to {owner}'s server: {res.name}")
-            except Exception as e:
-                print(f"[WARN] Could not connect to {owner}: {e}")
+    for owner, name, plex in plex_adapter.friend_servers(token, target_friend):
+        if plex is None:
+            print(f"[WARN] Could not connect to {owner}: no connection answered in time")
+            continue
+        servers[owner] = plex
+        print(f"[INFO] Connected to {owner}'s server: {name}")
     return servers
 
 # === Utilities ===
@@ -151,15 +150,25 @@ def wrap_summary_with_line_limit(text, font, max_width, draw, max_lines=3):
     return lines
 
 def download_logo_in_memory(item, baseurl, token):
-    url = f"{baseurl}/library/metadata/{item.ratingKey}/clearLogo?X-Plex-Token={token}"
+    url = plex_adapter.clear_logo_url(item, baseurl, token)
+    if url is None: return None  # metadata says there is no clearLogo
     try:
-        r = requests.get(url, timeout=10)
+        r = http_client.get(url, timeout=10)
         if r.status_code == 200:
             return Image.open(BytesIO(r.content))
     except:
         pass
     return None
 
+def download_blurred_art(url):
+    try:
+        r = http_client.get(url, timeout=10)
+        if r.status_code == 200:
+            return Image.open(BytesIO(r.content))
+    except:
+        pass
+    return None  # canvas falls back to local blur
+
 # === Background Pipeline ===
 def vignette_side(h, w, fade_ratio=0.3, fade_power=2.5, position="bottom-left"):
     y, x = np.ogrid[0:h, 0:w]
@@ -178,14 +187,17 @@ def vignette_side(h, w, fade_ratio=0.3, fade_power=2.5, position="bottom-left"):
 
     return Image.fromarray((alpha ** fade_power * 255).astype(np.uint8))
 
-def create_blurry_background(image, size=(3840,2160), blur_radius=800, dither_strength=16):
-    bg = image.resize(size, Image.LANCZOS).filter(ImageFilter.GaussianBlur(radius=blur_radius))
+def create_blurry_background(image, size=(3840,2160), blur_radius=800, dither_strength=16, blurred_img=None):
+    if blurred_img is not None:  # already blurred by Plex, only upscale it
+        bg = blurred_img.convert("RGB").resize(size, Image.BICUBIC)
+    else:
+        bg = image.resize(size, Image.LANCZOS).filter(ImageFilter.GaussianBlur(radius=blur_radius))
     bg_array = np.array(bg).astype(np.float32)
     noise = np.random.uniform(-dither_strength, dither_strength, bg_array.shape)
     return Image.fromarray(np.clip(bg_array+noise,0,255).astype(np.uint8))
 
-def generate_background_fast(input_img, target_width=3000):
-    canvas_rgb = create_blurry_background(input_img, size=(3840,2160), blur_radius=800)
+def generate_background_fast(input_img, target_width=3000, blurred_img=None):
+    canvas_rgb = create_blurry_background(input_img, size=(3840,2160), blur_radius=800, blurred_img=blurred_img)
     canvas_array = (np.array(canvas_rgb).astype(np.float32)*0.4).clip(0,255).astype(np.uint8)
     canvas_rgb = Image.fromarray(canvas_array)
 
@@ -197,36 +209,34 @@ def generate_background_fast(input_img, target_width=3000):
     img_resized = input_img.resize(new_size, Image.LANCZOS).convert("RGBA")
 
     h, w = img_resized.height, img_resized.width
-    mask = vignette_side(h, w, fade_ratio=0.3, fade_power=2.5, position="bottom-left")
-    mask = mask.filter(ImageFilter.GaussianBlur(radius=50))
+    mask = vignette_mask(h, w)
     img_resized.putalpha(mask)
 
     canvas.paste(img_resized, (3840-w,0), img_resized)
     return canvas.convert("RGB")
 
 # === Core Image Processing ===
-def generate_background_for_item(item, media_type, order_type, plex_logo, target_folder, friend, plex):
-    art_url = item.artUrl
+def generate_background_for_item(item, media_type, order_type, render_pool, target_folder, friend, plex):
+    art_url = plex_adapter.art_url(item, width=2700, original=original_art)
     if not art_url:
         print(f"[WARN] No art for {item.title}")
-        return
+        return None
+
+    blur_url = server_blur and plex_adapter.blurred_art_url(item)
 
     try:
-        r = requests.get(art_url, timeout=10); r.raise_for_status()
-        art = Image.open(BytesIO(r.content)).convert("RGB")
+        # art, clearLogo and blurred art are downloaded together
+        r, clogo, blurred = http_client.fan_out([
+            (art_url, lambda: http_client.get(art_url, timeout=10)),
+            (art_url, download_logo_in_memory, item, plex._baseurl, plex._token),
+            (art_url, download_blurred_art, blur_url) if blur_url else (art_url, lambda: None),
+        ])
+        r.raise_for_status()
     except Exception as e:
         print(f"[ERROR] Could not fetch art for {item.title}: {e}")
-        return
-
-    canvas = generate_background_fast(art, target_width=2700)
-    draw = ImageDraw.Draw(canvas)
+        return None
 
-    ft_title   = ImageFont.truetype(env_font_name, size=190)
-    ft_info    = ImageFont.truetype(env_font_name, size=55)
-    ft_summary = ImageFont.truetype(env_font_name, size=50)
-    ft_custom  = ImageFont.truetype(env_font_name, size=60)
-
-    # Metadata
+    # Metadata, read here as plexapi objects stay in this process
     if media_type == "movie":
         genres = [g.tag for g in item.genres][:3]
         dur    = item.duration and f"{item.duration//3600000}h {(item.duration//60000)%60}min"
@@ -234,14 +244,68 @@ def generate_background_for_item(item, media_type, order_type, plex_logo, target
         parts  = [str(item.year)] + genres + ([dur] if dur else []) + ([f"IMDb: {rating}"] if rating else [])
     else:
         genres = [g.tag for g in item.genres][:3]
-        seasons= len(item.seasons())
+        seasons= plex_adapter.season_count(item)
         rating = item.audienceRating or item.rating or ""
         parts  = [str(item.year)] + genres + ([f"{seasons} Season" if seasons==1 else f"{seasons} Seasons"]) + ([f"IMDb: {rating}"] if rating else [])
-    info_text = "  •  ".join(parts)
-    draw_text_with_shadow(draw, (210,650), info_text, ft_info, info_color, shadow_color, (shadow_offset,)*2)
+
+    safe = clean_filename(unicodedata.normalize("NFKD",item.title).encode("ASCII","ignore").decode())
+
+    # Drawing is left to the shared render pool
+    job = {
+        "title": item.title, "summary": item.summary, "info_text": "  •  ".join(parts),
+        "order_type": order_type, "friend": friend,
+        "art": r.content, "clogo": clogo, "blurred": blurred,
+        "out_path": os.path.join(target_folder,f"{safe}.jpg"),
+    }
+    try:
+        return render_pool.submit(render_background, job)
+    except BrokenProcessPool as e:
+        print(f"[ERROR] Could not queue {item.title}, the render pool is broken: {e}")
+        return None
+
+# === Render Workers ===
+render_state = {}  # fonts, Plex logo and vignette masks of this worker process
+
+def init_render_worker(font_path, plex_logo):
+    # loaded once per worker instead of once per background
+    try:
+        render_state["fonts"] = [ImageFont.truetype(font_path, size=size) for size in (190, 55, 50, 60)]
+    except OSError as e:
+        print(f"[ERROR] Failed to load font from '{font_path}': {e}")
+        render_state["fonts"] = None
+    render_state["plex_logo"] = plex_logo
+    vignette_mask(int(2700 * 9 / 16), 2700)  # 16:9 art, nearly every item
+
+def vignette_mask(h, w):
+    # softened vignette of the resized art, computed once per size in each worker
+    masks = render_state.setdefault("masks", {})
+    if (h, w) not in masks:
+        mask = vignette_side(h, w, fade_ratio=0.3, fade_power=2.5, position="bottom-left")
+        masks[(h, w)] = mask.filter(ImageFilter.GaussianBlur(radius=50))
+    return masks[(h, w)]
+
+def render_background(job):
+    try:
+        draw_background(job)
+    except Exception as e:
+        print(f"[ERROR] Could not render {job['title']}: {e}")
+
+def draw_background(job):
+    if render_state["fonts"] is None:
+        print(f"[ERROR] Skipped {job['title']}, no font could be loaded.")
+        return
+    ft_title, ft_info, ft_summary, ft_custom = render_state["fonts"]
+    plex_logo = render_state["plex_logo"]
+    friend, order_type, clogo = job["friend"], job["order_type"], job["clogo"]
+
+    art = Image.open(BytesIO(job["art"])).convert("RGB")
+    canvas = generate_background_fast(art, target_width=2700, blurred_img=job["blurred"])
+    draw = ImageDraw.Draw(canvas)
+
+    draw_text_with_shadow(draw, (210,650), job["info_text"], ft_info, info_color, shadow_color, (shadow_offset,)*2)
 
     # Summary
-    summary = truncate_summary(item.summary, max_summary_chars)
+    summary = truncate_summary(job["summary"], max_summary_chars)
     lines = wrap_summary_with_line_limit(summary, ft_summary, max_summary_width, draw, max_lines=summary_max_lines)
     wrapped = "\n".join(lines)
     draw_text_with_shadow(draw, (210,730), wrapped, ft_summary, summary_color, shadow_color, (shadow_offset,)*2)
@@ -272,72 +336,72 @@ def generate_background_for_item(item, media_type, order_type, plex_logo, target
     canvas.paste(plex_logo,(lx,ly),plex_logo)
 
     # ClearLogo or Title
-    clogo = download_logo_in_memory(item, plex._baseurl, plex._token)
     if clogo:
         clogo = resize_logo(clogo,1300,400).convert("RGBA")
         canvas.paste(clogo,(210,650-clogo.height-25),clogo)
     else:
-        draw_text_with_shadow(draw,(200,420),truncate_summary(item.title,30),ft_title,main_color,shadow_color,(shadow_offset,)*2)
+        draw_text_with_shadow(draw,(200,420),truncate_summary(job["title"],30),ft_title,main_color,shadow_color,(shadow_offset,)*2)
 
     # Save
-    today = datetime.today().strftime("%Y%m%d")
-    safe = clean_filename(unicodedata.normalize("NFKD",item.title).encode("ASCII","ignore").decode())
-    out_path = os.path.join(target_folder,f"{safe}.jpg")
-    canvas.convert("RGB").save(out_path,quality=95)
-    print(f"Saved: {out_path}")
-
-
-# === Sorting Helpers ===
-def sort_movies(movies,k): return sorted([m for m in movies if getattr(m,k,None)], key=lambda x:getattr(x,k), reverse=True)
-def sort_shows(shows,k):
-    arr=[]
-    for s in shows:
-        eps=[e for e in s.episodes() if getattr(e,k,None)]
-        if eps: arr.append((s,max(eps,key=lambda e:getattr(e,k))))
-    return [s for s,_ in sorted(arr,key=lambda t:getattr(t[1],k),reverse=True)]
-
-# === Download Latest Media ===
-def download_latest_media(plex,order,lim,typ,base_bg,over,logo,friend):
-    items = plex.library.search(libtype='movie' if typ=='movie' else 'show')
-    key   = 'originallyAvailableAt' if order=='aired' else 'addedAt'
-    sorted_items = (sort_movies if typ=='movie' else sort_shows)(items,key)[:lim]
-    odir = os.path.join(background_dir)
-    for itm in sorted_items:
-        generate_background_for_item(itm,typ,order,base_bg,over,logo,odir)
-        time.sleep(plex_api_delay_seconds)
+    canvas.convert("RGB").save(job["out_path"],quality=95)
+    print(f"Saved: {job['out_path']}")
+
 
 # === Media Fetching ===
-def sort_movies(movies,k): return sorted([m for m in movies if getattr(m,k,None)], key=lambda x:getattr(x,k), reverse=True)
-def sort_shows(shows,k):
-    arr=[]
-    for s in shows:
-        eps=[e for e in s.episodes() if getattr(e,k,None)]
-        if eps: arr.append((s,max(eps,key=lambda e:getattr(e,k))))
-    return [s for s,_ in sorted(arr,key=lambda t:getattr(t[1],k),reverse=True)]
-
-def download_latest_media(plex, order, lim, typ, plex_logo, friend):
-    items = plex.library.search(libtype="movie" if typ=="movie" else "show")
-    key   = "originallyAvailableAt" if order=="aired" else "addedAt"
-    sorted_items = (sort_movies if typ=="movie" else sort_shows)(items,key)[:lim]
+def download_latest_media(plex, order, lim, typ, friend, render_pool):
+    group = "aired" if order=="aired" else "added"
+    if typ=="movie":
+        # sorted and limited by Plex, only the top items of each section come back
+        sorted_items = plex_adapter.newest_items(plex_adapter.library_sections(plex,"movie"), group, lim, fast=fast_listing)
+    else:
+        # shows ranked by their latest episode from one sorted episode listing
+        sorted_items = plex_adapter.newest_shows(plex_adapter.library_sections(plex,"show"), group, lim, fast=fast_listing)
 
+    renders = {}  # render future -> item, reported in the entry point
     for itm in sorted_items:
-        generate_background_for_item(itm, typ, order, plex_logo, background_dir, friend, plex)
-        time.sleep(plex_api_delay_seconds)
+        future = generate_background_for_item(itm, typ, order, render_pool, background_dir, friend, plex)
+        if future: renders[future] = f"{itm.title} ({friend})"
+        time.sleep(plex_api_delay_seconds)  # politeness towards this friend's server only
+    return renders
 
 # === Main ===
-def main_for_friend(plex, friend):
-    download_font(env_font_url, env_font_name)
-    logo_file = "plexlogo.png" if logo_variant=="white" else "plexlogo_color.png"
-    plex_logo = Image.open(os.path.join(os.path.dirname(__file__),logo_file)).convert("RGBA")
-
+def main_for_friend(plex, friend, render_pool):
+    print(f"\n=== Processing {friend} ===")
+    renders = {}
     if download_movies:
-        download_latest_media(plex, order_by, limit, "movie", plex_logo, friend)
+        renders.update(download_latest_media(plex, order_by, limit, "movie", friend, render_pool))
     if download_series:
-        download_latest_media(plex, order_by, limit, "show", plex_logo, friend)
+        renders.update(download_latest_media(plex, order_by, limit, "show", friend, render_pool))
+    return renders
 
 if __name__=="__main__":
+    # cleared here rather than at import, render workers may import this module again
+    if os.path.exists(background_dir):
+        shutil.rmtree(background_dir)
     os.makedirs(background_dir, exist_ok=True)
+    download_font(env_font_url, env_font_name)
+    logo_file = "plexlogo.png" if logo_variant=="white" else "plexlogo_color.png"
+    plex_logo = Image.open(os.path.join(os.path.dirname(__file__),logo_file)).convert("RGBA")
+
+    reload_counter = plex_adapter.count_reloads() if debug else None
     servers = get_friend_servers(PLEX_TOKEN, TARGET_FRIEND)
-    for friend, plex in servers.items():
-        print(f"\n=== Processing {friend} ===")
-        main_for_friend(plex, friend)
+    # friend servers are worked on at once, every render goes to one shared process pool
+    # workers are spawned, a fork from a busy thread could inherit a held lock and hang
+    with ProcessPoolExecutor(max_workers=render_workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=init_render_worker,
+                             initargs=(env_font_name, plex_logo)) as render_pool, \
+         ThreadPoolExecutor(max_workers=friend_workers) as friend_pool:
+        jobs = {friend_pool.submit(main_for_friend, plex, friend, render_pool): friend for friend, plex in servers.items()}
+        renders = {}
+        for job in as_completed(jobs):
+            if job.exception():
+                print(f"[ERROR] Could not process {jobs[job]}: {job.exception()}")
+            else:
+                renders.update(job.result())
+        # renders lost by the pool (killed worker, unpicklable job) are reported too
+        for render in as_completed(renders):
+            if render.exception():
+                print(f"[ERROR] Could not render {renders[render]}: {render.exception()}")
+    if reload_counter is not None:
+        reload_counter.stop()
+        print(f"[DEBUG] Implicit plexapi reloads this run: {reload_counter.summary()}")
@@ -1,6 +1,7 @@
 # TMDB background generator for Radarr and Sonarr upcoming releases using a colored background and vignetting effect
 
-import requests
+import http_client
+import tmdb_client
 import numpy as np
 from datetime import datetime, timedelta, timezone
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
@@ -14,17 +15,20 @@ RADARR_URL = os.getenv('RADARR_URL')
 SONARR_URL = os.getenv('SONARR_URL')
 RADARR_API_KEY = os.getenv('RADARR_API_KEY')
 SONARR_API_KEY = os.getenv('SONARR_API_KEY')
-TMDB_BEARER_TOKEN = os.getenv('TMDB_BEARER_TOKEN')
 DAYS_AHEAD = int(os.getenv('DAYS_AHEAD'))
-TMDB_BASE_URL = os.getenv('TMDB_BASE_URL')
-TMDB_IMG_BASE = os.getenv('TMDB_IMG_BASE')
 RADARR_SONARR_LOGO = os.getenv('RADARR_SONARR_LOGO')
 LANGUAGE = os.getenv("TMDB_LANGUAGE", "en-US")
 
+# Open connections to Radarr, Sonarr and TMDB up front
+http_client.preconnect(RADARR_URL, SONARR_URL, tmdb_client.TMDB_BASE_URL, tmdb_client.TMDB_IMAGE_BASE)
+
+# Drop cached TMDB metadata of titles that changed since the last run
+tmdb_client.sync_changes()
+
 
 try:
     url = f"{RADARR_URL}/api/v3/system/status"
-    resp = requests.get(url, headers={"X-Api-Key": RADARR_API_KEY})
+    resp = http_client.get(url, headers={"X-Api-Key": RADARR_API_KEY})
     resp.raise_for_status()
     data = resp.json()
     print(f"Radarr: {data.get('appName')} v{data.get('version')}")
@@ -33,7 +37,7 @@ except Exception as e:
 
 try:
     url = f"{SONARR_URL}/api/v3/system/status"
-    resp = requests.get(url, headers={"X-Api-Key": SONARR_API_KEY})
+    resp = http_client.get(url, headers={"X-Api-Key": SONARR_API_KEY})
     resp.raise_for_status()
     data = resp.json()
     print(f"Sonarr: {data.get('appName')} v{data.get('version')}")
@@ -41,16 +45,10 @@ except Exception as e:
     print(f"Sonarr connection failed: {e}")
 
 
-TMDB_HEADERS = {
-    "accept": "application/json",
-    "Authorization": f"Bearer {TMDB_BEARER_TOKEN}"
-}
-
-
 # --- UTILITIES ---
 def fetch_json(url, headers=None, params=None):
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
+        resp = http_client.get(url, headers=headers, params=params, timeout=10)
         resp.raise_for_status()
         return resp.json()
     except Exception as e:
@@ -92,45 +90,12 @@ def wrap_text(text, width=70, max_lines=2):
     return "\n".join(textwrap.wrap(text, width=width, max_lines=max_lines, placeholder=" ..."))
 
 def resolve_tmdb_from_tvdb(tvdb_id):
-    url = f"{TMDB_BASE_URL}/find/{tvdb_id}?language={LANGUAGE}"
-    params = {"external_source": "tvdb_id"}
-    result = fetch_json(url, headers=TMDB_HEADERS, params=params)
+    params = {"language": LANGUAGE, "external_source": "tvdb_id"}
+    result = tmdb_client.get_json(f"find/{tvdb_id}", params)
     if result.get("tv_results"):
         return result["tv_results"][0]["id"]
     return None
 
-def get_logo(media_type, media_id, language):
-    # Prepare language code (fr-FR -> fr)
-    lang_code = language.split("-")[0]
-
-    # Build TMDB API URL
-    url = f"{TMDB_BASE_URL}/{media_type}/{media_id}/images?language={LANGUAGE}"
-    response = requests.get(url, headers={"accept": "application/json","Authorization": f"Bearer {TMDB_BEARER_TOKEN}"})
-    if response.status_code != 200:
-        return None
-
-    logos = response.json().get("logos", [])
-
-    # If no logos at all, try English fallback
-    if not logos:
-        url_en = f"{TMDB_BASE_URL}/{media_type}/{media_id}/images?language=en"
-        response_en = requests.get(url_en, headers={"accept": "application/json","Authorization": f"Bearer {TMDB_BEARER_TOKEN}"})
-        if response_en.status_code == 200:
-            logos_en = response_en.json().get("logos", [])
-            if logos_en:
-                return sorted(logos_en, key=lambda x: x.get("vote_average", 0), reverse=True)[0]["file_path"]
-        return None
-
-    # 1. Exact match for requested language
-    lang_match = [l for l in logos if l.get("iso_639_1") == LANGUAGE]
-    if lang_match:
-        # Pick highest rated
-        return sorted(lang_match, key=lambda x: x.get("vote_average", 0), reverse=True)[0]["file_path"]
-
-    # 4. Last fallback: best-rated logo overall
-    return sorted(logos, key=lambda x: x.get("vote_average", 0), reverse=True)[0]["file_path"]
-
-
 def format_duration(minutes):
     if not minutes:
         return "N/A"
@@ -235,7 +200,7 @@ def generate_background_fast(input_img, target_width=3000):
 def process_image(image_url, title, overview, genre, year, rating, custom_text, is_movie, tmdb_id, duration=None, seasons=None):
     try:
         # --- Download main image ---
-        response = requests.get(image_url, timeout=10)
+        response = http_client.get(image_url, timeout=10)
         image = Image.open(BytesIO(response.content)).convert("RGB")
 
         # --- Generate fast 4K background ---
@@ -247,7 +212,7 @@ def process_image(image_url, title, overview, genre, year, rating, custom_text,
         font_path = "Roboto-Light.ttf"
         if not os.path.exists(font_path):
             font_url = "https://github.com/googlefonts/roboto/raw/main/src/hinted/Roboto-Light.ttf"
-            font_data = requests.get(font_url).content
+            font_data = http_client.get(font_url).content
             with open(font_path, 'wb') as f:
                 f.write(font_data)
 
@@ -270,10 +235,10 @@ def process_image(image_url, title, overview, genre, year, rating, custom_text,
 
         # --- Download TMDB logo if available ---
         logo_drawn = False
-        logo_path = get_logo("movie" if is_movie else "tv", tmdb_id, language="en")
-        if logo_path:
-            logo_url = f"{TMDB_IMG_BASE}{logo_path}"
-            logo_resp = requests.get(logo_url)
+        logo = tmdb_client.get_logo("movie" if is_movie else "tv", tmdb_id, LANGUAGE)
+        if logo:
+            logo_url = tmdb_client.logo_url(logo, 1000, 500)
+            logo_resp = http_client.get(logo_url)
             if logo_resp.status_code == 200:
                 logo_img = Image.open(BytesIO(logo_resp.content))
                 logo_img = resize_logo(logo_img, 1000, 500).convert("RGBA")
@@ -382,7 +347,7 @@ def get_sonarr_upcoming():
 # --- FETCH DETAILS FROM TMDB ---
 def get_tmdb_details(tmdb_id, is_movie):
     media_type = "movie" if is_movie else "tv"
-    data = fetch_json(f"{TMDB_BASE_URL}/{media_type}/{tmdb_id}?language={LANGUAGE}", headers=TMDB_HEADERS)
+    data = tmdb_client.get_json(f"{media_type}/{tmdb_id}", {"language": LANGUAGE})
     return {
         "title": data.get("title") or data.get("name"),
         "overview": data.get("overview", ""),
@@ -403,7 +368,7 @@ if __name__ == "__main__":
     for tmdb_id, is_movie in all_entries:
         details = get_tmdb_details(tmdb_id, is_movie)
         if details["backdrop_path"]:
-            image_url = f"{TMDB_IMG_BASE}{details['backdrop_path']}"
+            image_url = tmdb_client.backdrop_url(details['backdrop_path'], render_width=3000)
             process_image(
                 image_url=image_url,
                 title=truncate(details['title'], 45),
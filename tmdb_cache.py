@@ -0,0 +1,161 @@
+# On-disk cache for TMDB metadata responses
+# Entries are keyed by the normalized request (endpoint path plus sorted query
+# parameters, language included) and expire after a TTL picked per endpoint class
+
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlencode
+
+# Folder holding one JSON file per cached response
+CACHE_DIR = os.getenv('TMDB_CACHE_DIR', os.path.join('.cache', 'tmdb'))
+# Time of the last sync with the TMDB changes endpoints
+SYNC_PATH = os.path.join(CACHE_DIR, 'changes_sync.json')
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# TTL in seconds per endpoint class, the first matching pattern wins
+# Endpoints that match nothing are not cached
+TTL_RULES = [
+    (r'^genre/', 7 * DAY),                    # Genre lists barely ever change
+    (r'^(find|search/keyword)', 7 * DAY),     # External id and keyword id lookups
+    (r'^(movie|tv)/\d+', 365 * DAY),          # Details, keywords and images, evicted by tmdb_client.sync_changes() or aired_since_stored()
+    (r'^(trending|discover)/', 15 * MINUTE),  # Candidate lists
+]
+
+
+def normalize(path, params=None):
+    """
+    Builds the cache key of a request: path without surrounding slashes, followed by
+    the query parameters sorted by name.
+    """
+    path = path.strip('/')
+    query = urlencode(sorted((params or {}).items()))
+    return f"{path}?{query}" if query else path
+
+
+def ttl_for(path):
+    """
+    Returns the TTL in seconds for an endpoint path, 0 when it should not be cached.
+    """
+    path = path.strip('/')
+    for pattern, ttl in TTL_RULES:
+        if re.match(pattern, path):
+            return ttl
+    return 0
+
+
+def _entry_path(path, key):
+    # Files are prefixed with the first two path segments (e.g. movie_603) so the
+    # entries of a single title can be found without opening every file
+    prefix = "_".join(re.sub(r'[^A-Za-z0-9.-]', '-', part) for part in path.strip('/').split('/')[:2])
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{prefix}_{digest}.json")
+
+
+def load(path, params=None):
+    """
+    Returns the cached data for a request, or None when missing or expired.
+    """
+    ttl = ttl_for(path)
+    if not ttl:
+        return None
+    key = normalize(path, params)
+    try:
+        with open(_entry_path(path, key), encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get('key') != key or time.time() - entry.get('stored', 0) > ttl:
+        return None
+    if aired_since_stored(path, entry):
+        return None
+    return entry.get('data')
+
+
+def aired_since_stored(path, entry):
+    """
+    Tells whether cached TV details were outdated by an episode airing. last_air_date,
+    last_episode_to_air and next_episode_to_air move on the air date without any edit,
+    so /tv/changes never reports them and the long TTL alone would keep them stale.
+    """
+    if not re.match(r'^tv/\d+$', path.strip('/')):
+        return False
+    air_date = ((entry.get('data') or {}).get('next_episode_to_air') or {}).get('air_date')
+    if not air_date:
+        return False
+    stored_day = time.strftime('%Y-%m-%d', time.localtime(entry.get('stored', 0)))
+    return stored_day <= air_date <= time.strftime('%Y-%m-%d')
+
+
+def store(path, params, data):
+    """
+    Saves the data of a successful request, if its endpoint class is cacheable.
+    """
+    if not ttl_for(path):
+        return
+    key = normalize(path, params)
+    entry_path = _entry_path(path, key)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see half an entry
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'stored': time.time(), 'data': data}, f)
+        os.replace(tmp_path, entry_path)
+    except OSError as e:
+        print(f"[WARN] Could not write TMDB cache entry for {key}: {e}")
+
+
+def cached_title_ids(media_type):
+    """
+    Returns the ids of the movies or TV shows ('movie' or 'tv') with cached entries.
+    """
+    ids = set()
+    for entry_path in glob.glob(os.path.join(CACHE_DIR, f"{media_type}_*_*.json")):
+        tmdb_id = os.path.basename(entry_path).split('_')[1]
+        if tmdb_id.isdigit():
+            ids.add(int(tmdb_id))
+    return ids
+
+
+def evict_title(media_type, tmdb_id):
+    """
+    Removes every cached entry of a title: details, keywords and images.
+    """
+    for entry_path in glob.glob(os.path.join(CACHE_DIR, f"{media_type}_{tmdb_id}_*.json")):
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
+
+
+def last_sync():
+    """
+    Returns the timestamp of the last changes sync, or None if there never was one.
+    """
+    try:
+        with open(SYNC_PATH, encoding='utf-8') as f:
+            return json.load(f).get('synced')
+    except (OSError, ValueError):
+        return None
+
+
+def save_sync(timestamp):
+    """
+    Records the timestamp of a completed changes sync.
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{SYNC_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'synced': timestamp}, f)
+        os.replace(tmp_path, SYNC_PATH)
+    except OSError as e:
+        print(f"[WARN] Could not record the TMDB changes sync: {e}")
@@ -0,0 +1,314 @@
+# Shared TMDB helpers for the TMDB, Trakt and Radarr/Sonarr scripts
+
+import os
+import time
+
+import requests
+from dotenv import load_dotenv
+
+import http_client
+import tmdb_cache
+
+load_dotenv(verbose=True)
+
+TMDB_BEARER_TOKEN = os.getenv('TMDB_BEARER_TOKEN')
+# Scripts historically disagreed on the trailing slash, so normalize it here
+TMDB_BASE_URL = (os.getenv('TMDB_BASE_URL') or 'https://api.themoviedb.org/3').rstrip('/')
+
+headers = {
+    "accept": "application/json",
+    "Authorization": f"Bearer {TMDB_BEARER_TOKEN}"
+}
+
+# TMDB_IMG_BASE points at a size folder (e.g. .../t/p/original), the size is now picked per image
+TMDB_IMAGE_BASE = (os.getenv('TMDB_IMG_BASE') or 'https://image.tmdb.org/t/p/original').rstrip('/').rsplit('/', 1)[0] + '/'
+# Widths served by the image CDN below 'original', smallest first
+BACKDROP_SIZES = [300, 780, 1280]
+LOGO_SIZES = [45, 92, 154, 185, 300, 500]
+# When no size covers the rendered width, the largest one is still used if it covers at
+# least this share of it (the templates resample anyway), instead of the original file.
+# 0.5 lets w500 logos fill the 1000px logo box; backdrops drawn 2667-3000px wide only
+# leave 'original' once this is lowered to about 0.4
+MIN_IMAGE_COVERAGE = float(os.getenv('TMDB_MIN_IMAGE_COVERAGE', 0.5))
+
+# TMDB only serves the changes of the last 14 days
+CHANGES_WINDOW = 14 * tmdb_cache.DAY
+# Cached titles are trusted for this long before the changes endpoints are polled again
+CHANGES_SYNC_INTERVAL = int(os.getenv('TMDB_CHANGES_SYNC_INTERVAL', 6 * tmdb_cache.HOUR))
+
+# Enriched titles already fetched during this run, keyed by (media_type, tmdb_id, language)
+_titles = {}
+
+
+def get_json(path, params=None):
+    """
+    Calls a TMDB API endpoint and returns the decoded JSON, or {} on failure.
+    Successful responses are served from and saved to the on-disk metadata cache.
+
+    :param path: Endpoint path relative to TMDB_BASE_URL, e.g. 'movie/603'.
+    :param params: Optional query parameters.
+    """
+    path = path.strip('/')
+    cached = tmdb_cache.load(path, params)
+    if cached is not None:
+        return cached
+
+    url = f"{TMDB_BASE_URL}/{path}"
+    try:
+        response = http_client.get(url, headers=headers, params=params)
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching {url}: {e}")
+        return {}
+    if response.status_code != 200:
+        return {}
+
+    data = response.json()
+    tmdb_cache.store(path, params, data)
+    return data
+
+
+def image_languages(language):
+    """
+    Returns the include_image_language value for the requested language, English and
+    language-less images, e.g. 'fr,en,null' for 'fr-FR'.
+    """
+    return ",".join(dict.fromkeys([language.split("-")[0], "en", "null"]))
+
+
+def get_title(media_type, tmdb_id, language="en-US"):
+    """
+    Fetches the details, keywords and images of a movie or TV show in a single
+    append_to_response call. Results are kept for the rest of the run so every
+    filter and render step can read from them without another request.
+
+    :param media_type: 'movie' or 'tv'.
+    :param tmdb_id: TMDB id of the title.
+    :param language: TMDB language code, e.g. 'fr-FR'.
+    :return: Details dict with 'keywords' and 'images' included.
+    """
+    key = (media_type, tmdb_id, language)
+    if key not in _titles:
+        params = {
+            "language": language,
+            "append_to_response": "keywords,images",
+            # Appended images follow 'language', so also ask for English and language-less ones
+            "include_image_language": image_languages(language),
+        }
+        _titles[key] = get_json(f"{media_type}/{tmdb_id}", params)
+    return _titles[key]
+
+
+def iter_results(path, params=None, max_pages=10):
+    """
+    Lazily yields the results of a paginated TMDB endpoint. The next page is only
+    requested once every result of the previous one has been consumed, so a caller
+    that stops early never pays for pages it did not need.
+
+    :param path: Endpoint path, e.g. 'discover/movie' or 'trending/tv/week'.
+    :param params: Query parameters, 'page' is managed here.
+    :param max_pages: Hard limit on the number of pages walked.
+    """
+    page = 1
+    while page <= max_pages:
+        data = get_json(path, {**(params or {}), "page": page})
+        yield from data.get('results', [])
+        if page >= data.get('total_pages', 0):
+            return
+        page += 1
+
+
+def title_keywords(details):
+    """
+    Returns the lowercased keyword names of an enriched title.
+    Movies list them under 'keywords', TV shows under 'results'.
+    """
+    keywords = details.get('keywords') or {}
+    entries = keywords.get('keywords', keywords.get('results', []))
+    return [keyword['name'].lower() for keyword in entries]
+
+
+def title_logos(details):
+    """
+    Returns the logos of an enriched title.
+    """
+    return (details.get('images') or {}).get('logos', [])
+
+
+def keyword_ids(names):
+    """
+    Resolves keyword names to TMDB keyword ids with search/keyword.
+
+    :param names: Keyword names as used in the exclusion lists.
+    :return: (ids, unresolved) where unresolved lists the names without an exact match.
+    """
+    ids, unresolved = [], []
+    for name in dict.fromkeys(name.lower() for name in names):
+        results = get_json("search/keyword", {"query": name}).get('results', [])
+        matches = [keyword['id'] for keyword in results if keyword.get('name', '').lower() == name]
+        if matches:
+            ids.extend(matches)
+        else:
+            unresolved.append(name)
+    return ids, unresolved
+
+
+def plan_discover(media_type, language, excluded_genre_ids=(), excluded_keywords=(), min_date=None):
+    """
+    Compiles exclusion rules into discover/movie or discover/tv query parameters.
+    Country rules are not part of the plan, discover can only include origin countries.
+
+    :param media_type: 'movie' or 'tv'.
+    :param language: TMDB language code.
+    :param excluded_genre_ids: Genre ids excluded whatever the country.
+    :param excluded_keywords: Keyword names to exclude.
+    :param min_date: Oldest release date (movies) or episode air date (TV) to keep.
+    :return: (params, client_keywords) where client_keywords still need a client-side check.
+    """
+    params = {
+        "language": language,
+        "sort_by": "popularity.desc",
+        "include_adult": "false",
+    }
+    if excluded_genre_ids:
+        params["without_genres"] = ",".join(str(genre_id) for genre_id in excluded_genre_ids)
+
+    ids, client_keywords = keyword_ids(excluded_keywords)
+    if ids:
+        params["without_keywords"] = ",".join(str(keyword_id) for keyword_id in ids)
+
+    if min_date:
+        date_param = "primary_release_date.gte" if media_type == 'movie' else "air_date.gte"
+        params[date_param] = min_date.strftime("%Y-%m-%d")
+
+    return params, client_keywords
+
+
+def pick_logo(logos, language="en-US"):
+    """
+    Ranks logos locally: requested language first, then English, then language-less
+    logos, and the highest vote_average within each group. SVG logos are skipped as
+    PIL can't open them.
+
+    :param logos: Logo entries from an /images response.
+    :param language: TMDB language code, e.g. 'fr-FR'.
+    :return: Entry of the best logo (file_path, width, height...), or None.
+    """
+    preference = list(dict.fromkeys([language.split("-")[0], "en", None]))
+    candidates = [
+        logo for logo in logos
+        if logo.get("iso_639_1") in preference and not logo.get("file_path", "").endswith(".svg")
+    ]
+    if not candidates:
+        return None
+    best = min(candidates, key=lambda logo: (preference.index(logo.get("iso_639_1")), -logo.get("vote_average", 0)))
+    return best
+
+
+def get_logo(media_type, tmdb_id, language="en-US"):
+    """
+    Resolves the logo of a movie or TV show with a single /images request covering the
+    requested language, English and language-less logos.
+
+    :return: Entry of the best logo, or None.
+    """
+    data = get_json(f"{media_type}/{tmdb_id}/images", {"include_image_language": image_languages(language)})
+    return pick_logo(data.get('logos', []), language)
+
+
+def image_url(file_path, render_width, sizes, source_width=None):
+    """
+    Builds the URL of the smallest TMDB size that still covers the rendered width. When
+    none does, the largest size is used if it covers MIN_IMAGE_COVERAGE of the width
+    (a bounded upscale), and 'original' otherwise. At the default coverage this mostly
+    helps logos and small sources, the 4K backdrops still come as 'original'.
+
+    :param file_path: Image path as returned by the API, e.g. '/abc.jpg'.
+    :param render_width: Width in pixels the image ends up at once placed on the canvas.
+    :param sizes: Size ladder, BACKDROP_SIZES or LOGO_SIZES.
+    :param source_width: Width of the original file when known. Sizes wider than the
+        source are not upscaled by TMDB, so the original never needs to be asked for.
+    """
+    needed = min(render_width, source_width) if source_width else render_width
+    for size in sizes:
+        if size >= needed:
+            return f"{TMDB_IMAGE_BASE}w{size}{file_path}"
+    if sizes[-1] >= needed * MIN_IMAGE_COVERAGE:
+        return f"{TMDB_IMAGE_BASE}w{sizes[-1]}{file_path}"
+    return f"{TMDB_IMAGE_BASE}original{file_path}"
+
+
+def backdrop_url(file_path, render_width=None, render_height=None, details=None):
+    """
+    Builds the backdrop URL for a template that scales it to render_width, or to
+    render_height when no width is given.
+
+    :param details: Enriched title from get_title(), used to look up the backdrop's
+        real dimensions. Without it a 16:9 backdrop is assumed.
+    """
+    backdrops = ((details or {}).get('images') or {}).get('backdrops', [])
+    source = next((backdrop for backdrop in backdrops if backdrop.get('file_path') == file_path), {})
+    if render_width is None:
+        render_width = render_height * (source.get('aspect_ratio') or 16 / 9)
+    return image_url(file_path, render_width, BACKDROP_SIZES, source.get('width'))
+
+
+def logo_url(logo, box_width=1000, box_height=500):
+    """
+    Builds the URL of a logo entry for a template that fits it in box_width x box_height.
+    """
+    aspect_ratio = logo.get('aspect_ratio')
+    if not aspect_ratio and logo.get('width') and logo.get('height'):
+        aspect_ratio = logo['width'] / logo['height']
+    # Wide logos fill the box width, tall ones are limited by its height
+    render_width = min(box_width, box_height * aspect_ratio) if aspect_ratio else box_width
+    return image_url(logo['file_path'], render_width, LOGO_SIZES, logo.get('width'))
+
+
+def changed_ids(media_type, start, end):
+    """
+    Returns the ids of the movies or TV shows changed between two timestamps, using
+    /movie/changes or /tv/changes. Pages after the first are fetched concurrently.
+
+    :return: Set of ids, or None when a page could not be fetched.
+    """
+    params = {
+        "start_date": time.strftime("%Y-%m-%d", time.gmtime(start)),
+        "end_date": time.strftime("%Y-%m-%d", time.gmtime(end)),
+    }
+    path = f"{media_type}/changes"
+    first = get_json(path, {**params, "page": 1})
+    if 'results' not in first:
+        return None
+
+    pages = [first] + http_client.fan_out(
+        (TMDB_BASE_URL, get_json, path, {**params, "page": page})
+        for page in range(2, first.get('total_pages', 1) + 1)
+    )
+    if any('results' not in page for page in pages):
+        return None
+    return {result['id'] for page in pages for result in page['results']}
+
+
+def sync_changes():
+    """
+    Keeps the metadata cache correct with an effectively infinite TTL: evicts the cached
+    details, keywords and images of titles that changed on TMDB since the last sync.
+    Everything is evicted when the last sync is too old for the changes endpoints to cover,
+    or when the changes could not be fetched.
+    """
+    now = time.time()
+    synced = tmdb_cache.last_sync()
+    if synced and now - synced < CHANGES_SYNC_INTERVAL:
+        return
+
+    for media_type in ('movie', 'tv'):
+        cached = tmdb_cache.cached_title_ids(media_type)
+        if not cached:
+            continue
+        changed = changed_ids(media_type, synced, now) if synced and now - synced < CHANGES_WINDOW else None
+        stale = cached if changed is None else cached & changed
+        for tmdb_id in stale:
+            tmdb_cache.evict_title(media_type, tmdb_id)
+        print(f"TMDB cache: evicted {len(stale)} of {len(cached)} cached {media_type} titles")
+
+    tmdb_cache.save_sync(now)
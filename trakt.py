@@ -1,4 +1,5 @@
-import requests
+import http_client
+import tmdb_client
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, UnidentifiedImageError
 from io import BytesIO
 import os
@@ -12,21 +13,20 @@ load_dotenv(verbose=True)
 TRAKT_API_KEY = os.getenv('TRAKT_API_KEY')
 TRAKT_USERNAME = os.getenv('TRAKT_USERNAME')
 TRAKT_LISTNAME = os.getenv('TRAKT_LISTNAME')
-TMDB_BEARER_TOKEN = os.getenv('TMDB_BEARER_TOKEN')
-TMDB_BASE_URL = os.getenv('TMDB_BASE_URL')
+# TMDB_BEARER_TOKEN (your TMDB API Read Access Token) is read from .env by tmdb_client
 
-# Set your TMDB API Read Access Token key here after Bearer
-tmdb_headers = {
-    "accept": "application/json",
-    "Authorization": f"Bearer {TMDB_BEARER_TOKEN}"
-}
+# Open connections to the Trakt and TMDB hosts up front
+http_client.preconnect("https://api.trakt.tv", tmdb_client.TMDB_BASE_URL, tmdb_client.TMDB_IMAGE_BASE)
+
+# Drop cached TMDB metadata of titles that changed since the last run
+tmdb_client.sync_changes()
 
 # Save font locally
 truetype_url = 'https://github.com/googlefonts/roboto/raw/main/src/hinted/Roboto-Light.ttf'
 truetype_path = 'Roboto-Light.ttf'
 if not os.path.exists(truetype_path):
     try:
-        response = requests.get(truetype_url, timeout=10)
+        response = http_client.get(truetype_url, timeout=10)
         if response.status_code == 200:
             with open(truetype_path, 'wb') as f:
                 f.write(response.content)
@@ -57,7 +57,7 @@ def get_trakt_movies_and_shows(api_key, username, list_name):
         "trakt-api-key": api_key
     }
 
-    response = requests.get(url, headers=traktheaders)
+    response = http_client.get(url, headers=traktheaders)
     if response.status_code == 200:
         items = response.json()
         movies = [(item['movie']['title'], item['movie']['ids']['tmdb']) for item in items if item['type'] == 'movie']
@@ -67,18 +67,6 @@ def get_trakt_movies_and_shows(api_key, username, list_name):
         print(f"Error: Unable to fetch list (status code {response.status_code})")
         return [], []
 
-# Function to fetch the logo for a movie or TV show from TMDB
-def get_logo(media_type, media_id, language="en"):
-    logo_url = f"{TMDB_BASE_URL}{media_type}/{media_id}/images?language={language}"
-    logo_response = requests.get(logo_url, headers=tmdb_headers)
-    logo_data = logo_response.json()
-    if logo_response.status_code == 200:
-        logos = logo_response.json().get("logos", [])
-        for logo in logos:
-            if logo["iso_639_1"] == "en" and logo["file_path"].endswith(".png"):
-                return logo["file_path"]
-    return None
-
 # Function to resize an image while maintaining aspect ratio
 def resize_image(image, height):
     ratio = height / image.height
@@ -100,15 +88,11 @@ def resize_logo(image, width, height):
 
 # Function to get details of a TV show from TMDB
 def get_tv_show_details(tv_id):
-    tv_details_url = f'{TMDB_BASE_URL}tv/{tv_id}?language=en-US'
-    tv_details_response = requests.get(tv_details_url, headers=tmdb_headers)
-    return tv_details_response.json()
+    return tmdb_client.get_json(f'tv/{tv_id}', {"language": "en-US"})
 
 # Function to get details of a movie from TMDB
 def get_movie_details(movie_id):
-    movie_details_url = f'{TMDB_BASE_URL}movie/{movie_id}?language=en-US'
-    movie_details_response = requests.get(movie_details_url, headers=tmdb_headers)
-    return movie_details_response.json()
+    return tmdb_client.get_json(f'movie/{movie_id}', {"language": "en-US"})
 
 # Create a directory to save the backgrounds and clear its contents if it exists
 background_dir = "trakt_backgrounds"
@@ -137,8 +121,8 @@ def fetch_and_save_background_images(movies, shows):
                 
             backdrop_path = show_data.get("backdrop_path")
             if backdrop_path:
-                image_url = f"https://image.tmdb.org/t/p/original{backdrop_path}"
-                image_response = requests.get(image_url)
+                image_url = tmdb_client.backdrop_url(backdrop_path, render_height=1500)
+                image_response = http_client.get(image_url)
                 if image_response.status_code == 200:
                     show_image = Image.open(BytesIO(image_response.content))
                     show_image = resize_image(show_image, 1500)
@@ -167,11 +151,11 @@ def fetch_and_save_background_images(movies, shows):
                     #paste overlay
                     bckg.paste(overlay, (bckg.width - overlay.width, 0), overlay)
 
-                    #paste logo and if no logo exists in english draw show title  
-                    logo_path = get_logo(media_type, tmdb_id)
-                    if logo_path:
-                        logo_url = f"https://image.tmdb.org/t/p/original{logo_path}"
-                        logo_response = requests.get(logo_url)                        
+                    #paste logo and if no logo exists draw show title  
+                    logo = tmdb_client.get_logo(media_type, tmdb_id)
+                    if logo:
+                        logo_url = tmdb_client.logo_url(logo, 1000, 500)
+                        logo_response = http_client.get(logo_url)                        
                         try:
                             if logo_response.status_code == 200:
                                 logo_image = Image.open(BytesIO(logo_response.content))